@@ -5,223 +5,884 @@ Handles all database operations using SQLite
 
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from itertools import chain
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from datetime import date as date_type, datetime, timedelta
 import logging
 
+# Applied once when a pooled connection is opened, never per query
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',  # 64 MB
+    'PRAGMA mmap_size=268435456',  # 256 MB
+    'PRAGMA foreign_keys=ON',
+)
+
+# Readers open the file with mode=ro; journal mode is already set by the writer
+READER_PRAGMAS = (
+    'PRAGMA query_only=1',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',  # 64 MB
+    'PRAGMA mmap_size=268435456',  # 256 MB
+)
+
+# Prepared statements kept per connection by the sqlite3 module
+STATEMENT_CACHE_SIZE = 256
+
+# Seconds a connection waits on another process's lock before raising "database is locked"
+BUSY_TIMEOUT = 5.0
+
+# Rows pulled from SQLite per fetchmany() call when streaming results
+FETCH_BATCH_SIZE = 200
+
+# Bulk loads above this size use multi-row VALUES instead of executemany
+MULTI_INSERT_THRESHOLD = 100
+
+# SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds
+SQLITE_MAX_VARIABLES = 999
+
+# Bump whenever _SCHEMA_SQL changes so existing databases pick up the new objects
+SCHEMA_VERSION = 9
+
+_SCHEMA_SQL = '''
+-- Create users table
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    role TEXT NOT NULL DEFAULT 'staff',
+    is_active BOOLEAN DEFAULT 1,
+    last_login TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CHECK (role IN ('admin', 'dentist', 'hygienist', 'receptionist', 'staff'))
+);
+
+-- Create patients table
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    date_of_birth DATE,
+    gender TEXT CHECK (gender IN ('male', 'female', 'other', 'prefer_not_to_say')),
+    phone TEXT,
+    email TEXT,
+    address TEXT,
+    city TEXT,
+    state TEXT,
+    postal_code TEXT,
+    emergency_contact_name TEXT,
+    emergency_contact_phone TEXT,
+    emergency_contact_relationship TEXT,
+    medical_history TEXT,
+    allergies TEXT,
+    insurance_provider TEXT,
+    insurance_number TEXT,
+    insurance_group_number TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (created_by) REFERENCES users (id)
+);
+
+-- Create full-text index over patient names
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    first_name,
+    last_name,
+    content='patients',
+    content_rowid='id',
+    tokenize='unicode61'
+);
+
+-- Keep the full-text index in sync with the patients table
+CREATE TRIGGER IF NOT EXISTS patients_fts_insert AFTER INSERT ON patients BEGIN
+    INSERT INTO patients_fts (rowid, first_name, last_name)
+    VALUES (new.id, new.first_name, new.last_name);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_delete AFTER DELETE ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name)
+    VALUES ('delete', old.id, old.first_name, old.last_name);
+END;
+CREATE TRIGGER IF NOT EXISTS patients_fts_update AFTER UPDATE OF first_name, last_name ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name)
+    VALUES ('delete', old.id, old.first_name, old.last_name);
+    INSERT INTO patients_fts (rowid, first_name, last_name)
+    VALUES (new.id, new.first_name, new.last_name);
+END;
+
+-- Create appointments table
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    dentist_id INTEGER,
+    appointment_date DATE NOT NULL,
+    appointment_time TIME NOT NULL,
+    duration INTEGER DEFAULT 60,
+    appointment_type TEXT DEFAULT 'checkup',
+    treatment_plan TEXT,
+    notes TEXT,
+    status TEXT DEFAULT 'scheduled',
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id),
+    FOREIGN KEY (dentist_id) REFERENCES users (id),
+    FOREIGN KEY (created_by) REFERENCES users (id),
+    CHECK (status IN ('scheduled', 'confirmed', 'in_progress', 'completed', 'cancelled', 'no_show')),
+    CHECK (appointment_type IN ('checkup', 'cleaning', 'filling', 'extraction', 'root_canal', 'crown', 'consultation', 'emergency', 'follow_up'))
+);
+
+-- Create treatments table
+CREATE TABLE IF NOT EXISTS treatments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    category TEXT DEFAULT 'general',
+    duration INTEGER DEFAULT 60,
+    base_cost REAL NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (created_by) REFERENCES users (id),
+    CHECK (category IN ('preventive', 'restorative', 'cosmetic', 'surgical', 'emergency', 'general'))
+);
+
+-- Create treatment_records table
+CREATE TABLE IF NOT EXISTS treatment_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    treatment_id INTEGER NOT NULL,
+    appointment_id INTEGER,
+    dentist_id INTEGER,
+    treatment_date DATE NOT NULL,
+    treatment_notes TEXT,
+    actual_cost REAL NOT NULL,
+    payment_status TEXT DEFAULT 'pending',
+    completed_at TIMESTAMP,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id),
+    FOREIGN KEY (treatment_id) REFERENCES treatments (id),
+    FOREIGN KEY (appointment_id) REFERENCES appointments (id),
+    FOREIGN KEY (dentist_id) REFERENCES users (id),
+    FOREIGN KEY (created_by) REFERENCES users (id),
+    CHECK (payment_status IN ('pending', 'partial', 'paid', 'overdue', 'cancelled'))
+);
+
+-- Create invoices table
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_number TEXT UNIQUE NOT NULL,
+    patient_id INTEGER NOT NULL,
+    treatment_record_id INTEGER,
+    appointment_id INTEGER,
+    subtotal REAL NOT NULL DEFAULT 0.0,
+    tax_amount REAL NOT NULL DEFAULT 0.0,
+    discount_amount REAL NOT NULL DEFAULT 0.0,
+    total_amount REAL NOT NULL DEFAULT 0.0,
+    amount_paid REAL NOT NULL DEFAULT 0.0,
+    balance_due REAL NOT NULL DEFAULT 0.0,
+    invoice_date DATE NOT NULL,
+    due_date DATE NOT NULL,
+    status TEXT DEFAULT 'pending',
+    payment_terms TEXT DEFAULT 'Net 30',
+    notes TEXT,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES patients (id),
+    FOREIGN KEY (treatment_record_id) REFERENCES treatment_records (id),
+    FOREIGN KEY (appointment_id) REFERENCES appointments (id),
+    FOREIGN KEY (created_by) REFERENCES users (id),
+    CHECK (status IN ('draft', 'sent', 'paid', 'overdue', 'cancelled', 'refunded'))
+);
+
+-- Create invoice_items table
+CREATE TABLE IF NOT EXISTS invoice_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_id INTEGER NOT NULL,
+    treatment_record_id INTEGER,
+    description TEXT NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    unit_price REAL NOT NULL,
+    total_price REAL NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (invoice_id) REFERENCES invoices (id),
+    FOREIGN KEY (treatment_record_id) REFERENCES treatment_records (id)
+);
+
+-- Create payments table
+CREATE TABLE IF NOT EXISTS payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    invoice_id INTEGER NOT NULL,
+    payment_date DATE NOT NULL,
+    payment_amount REAL NOT NULL,
+    payment_method TEXT NOT NULL,
+    payment_reference TEXT,
+    notes TEXT,
+    created_by INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (invoice_id) REFERENCES invoices (id),
+    FOREIGN KEY (created_by) REFERENCES users (id),
+    CHECK (payment_method IN ('cash', 'credit_card', 'debit_card', 'check', 'insurance', 'online', 'other'))
+);
+
+-- Keep invoice totals in step with payments inside the inserting statement
+CREATE TRIGGER IF NOT EXISTS payments_apply_insert AFTER INSERT ON payments BEGIN
+    UPDATE invoices
+    SET amount_paid = amount_paid + new.payment_amount,
+        balance_due = total_amount - (amount_paid + new.payment_amount),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = new.invoice_id;
+END;
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(last_name, first_name);
+DROP INDEX IF EXISTS idx_appointments_date;  -- date lookups use the idx_appointments_date_time prefix
+CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments(patient_id);
+CREATE INDEX IF NOT EXISTS idx_treatment_records_patient ON treatment_records(patient_id);
+CREATE INDEX IF NOT EXISTS idx_invoices_patient ON invoices(patient_id);
+CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status);
+CREATE INDEX IF NOT EXISTS idx_payments_invoice_summary ON payments(invoice_id, payment_date DESC, payment_amount);
+DROP INDEX IF EXISTS idx_payments_invoice;  -- superseded by idx_payments_invoice_summary
+DROP INDEX IF EXISTS idx_payments_invoice_date;  -- superseded by idx_payments_invoice_summary
+CREATE INDEX IF NOT EXISTS idx_appointments_dentist ON appointments(dentist_id);
+CREATE INDEX IF NOT EXISTS idx_appointments_date_time ON appointments(appointment_date, appointment_time);
+CREATE INDEX IF NOT EXISTS idx_appointments_status ON appointments(status);
+CREATE INDEX IF NOT EXISTS idx_treatment_records_treatment ON treatment_records(treatment_id);
+CREATE INDEX IF NOT EXISTS idx_treatment_records_dentist ON treatment_records(dentist_id);
+CREATE INDEX IF NOT EXISTS idx_treatment_records_date ON treatment_records(treatment_date DESC);
+CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id);
+CREATE INDEX IF NOT EXISTS idx_invoices_date_id ON invoices(invoice_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_treatment_records_patient_date ON treatment_records(patient_id, treatment_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_patients_summary ON patients(last_name, first_name, phone, email, is_active) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_payments_date ON payments(payment_date DESC);
+'''
+
+_SQL_INSERT_USER = '''
+    INSERT INTO users (username, password_hash, first_name, last_name, email, role)
+    VALUES (?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_SQL_GET_USER_BY_ID = 'SELECT * FROM users WHERE id = ?'
+
+_SQL_GET_USERS_BY_ROLE = '''
+    SELECT id, username, first_name, last_name, email, role
+    FROM users
+    WHERE role = ? AND is_active = 1
+    ORDER BY last_name, first_name
+'''
+
+# Partial index answering _SQL_GET_USERS_BY_ROLE for dentists without a sort step.
+# Created only when the users table has the full DatabaseManager column set.
+_SQL_CREATE_DENTISTS_INDEX = '''
+CREATE INDEX IF NOT EXISTS idx_users_dentists_active ON users(last_name, first_name)
+    WHERE role = 'dentist' AND is_active = 1;
+'''
+
+_SQL_INSERT_PATIENT = '''
+    INSERT INTO patients (first_name, last_name, date_of_birth, gender, phone, email, 
+                        address, city, state, postal_code, emergency_contact_name,
+                        emergency_contact_phone, emergency_contact_relationship,
+                        medical_history, allergies, insurance_provider,
+                        insurance_number, insurance_group_number, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_PATIENT_COLUMNS = (
+    'first_name', 'last_name', 'date_of_birth', 'gender', 'phone', 'email',
+    'address', 'city', 'state', 'postal_code', 'emergency_contact_name',
+    'emergency_contact_phone', 'emergency_contact_relationship',
+    'medical_history', 'allergies', 'insurance_provider',
+    'insurance_number', 'insurance_group_number', 'created_by'
+)
+
+# Partial updates: a None parameter keeps the stored value
+_SQL_UPDATE_PATIENT = '''
+    UPDATE patients 
+    SET first_name = COALESCE(?, first_name), last_name = COALESCE(?, last_name),
+        date_of_birth = COALESCE(?, date_of_birth), gender = COALESCE(?, gender),
+        phone = COALESCE(?, phone), email = COALESCE(?, email),
+        address = COALESCE(?, address), city = COALESCE(?, city),
+        state = COALESCE(?, state), postal_code = COALESCE(?, postal_code),
+        emergency_contact_name = COALESCE(?, emergency_contact_name),
+        emergency_contact_phone = COALESCE(?, emergency_contact_phone),
+        emergency_contact_relationship = COALESCE(?, emergency_contact_relationship),
+        medical_history = COALESCE(?, medical_history), allergies = COALESCE(?, allergies),
+        insurance_provider = COALESCE(?, insurance_provider),
+        insurance_number = COALESCE(?, insurance_number),
+        insurance_group_number = COALESCE(?, insurance_group_number),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Narrow projections for list views, answered from idx_patients_summary
+_SQL_LIST_PATIENTS_SUMMARY = '''
+    SELECT id, first_name, last_name, phone, email, is_active
+    FROM patients
+    WHERE is_active = 1
+    ORDER BY last_name, first_name
+'''
+
+_SQL_COUNT_APPOINTMENTS = 'SELECT COUNT(*) FROM appointments'
+
+# Counted from idx_appointments_status without reading the table
+_SQL_COUNT_APPOINTMENTS_BY_STATUS = 'SELECT COUNT(*) FROM appointments WHERE status = ?'
+
+# Dashboard card counts in one statement; the patient count is answered from idx_patients_summary
+_SQL_DASHBOARD_COUNTS = '''
+    SELECT (SELECT COUNT(*) FROM patients WHERE is_active = 1),
+           (SELECT COUNT(*) FROM appointments WHERE status = 'scheduled'),
+           (SELECT COUNT(*) FROM treatments WHERE is_active = 1)
+'''
+
+_SQL_SEARCH_PATIENTS_SUMMARY = '''
+    SELECT p.id, p.first_name, p.last_name, p.phone, p.email, p.is_active
+    FROM patients p
+    JOIN patients_fts f ON f.rowid = p.id
+    WHERE patients_fts MATCH ? AND p.is_active = 1
+    ORDER BY p.last_name, p.first_name
+'''
+
+# Same as _SQL_UPDATE_PATIENT without the name columns, so idx_patients_name
+# and the patients_fts update trigger are left alone
+_SQL_UPDATE_PATIENT_DETAILS = '''
+    UPDATE patients 
+    SET date_of_birth = COALESCE(?, date_of_birth), gender = COALESCE(?, gender),
+        phone = COALESCE(?, phone), email = COALESCE(?, email),
+        address = COALESCE(?, address), city = COALESCE(?, city),
+        state = COALESCE(?, state), postal_code = COALESCE(?, postal_code),
+        emergency_contact_name = COALESCE(?, emergency_contact_name),
+        emergency_contact_phone = COALESCE(?, emergency_contact_phone),
+        emergency_contact_relationship = COALESCE(?, emergency_contact_relationship),
+        medical_history = COALESCE(?, medical_history), allergies = COALESCE(?, allergies),
+        insurance_provider = COALESCE(?, insurance_provider),
+        insurance_number = COALESCE(?, insurance_number),
+        insurance_group_number = COALESCE(?, insurance_group_number),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_GET_PATIENT_BY_ID = 'SELECT * FROM patients WHERE id = ?'
+
+_SQL_SEARCH_PATIENTS = '''
+    SELECT p.* FROM patients p
+    JOIN patients_fts f ON f.rowid = p.id
+    WHERE patients_fts MATCH ? AND p.is_active = 1
+    ORDER BY p.last_name, p.first_name
+'''
+
+_SQL_INSERT_APPOINTMENT = '''
+    INSERT INTO appointments (patient_id, dentist_id, appointment_date, appointment_time, 
+                            duration, appointment_type, treatment_plan, notes, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_SQL_SELECT_APPOINTMENTS = '''
+    SELECT a.id, a.patient_id, a.dentist_id, a.appointment_date, a.appointment_time,
+           a.duration, a.appointment_type, a.notes, a.status,
+           p.first_name, p.last_name, p.first_name || ' ' || p.last_name AS patient_name,
+           u.username AS dentist_name
+    FROM appointments a
+    JOIN patients p ON a.patient_id = p.id
+    LEFT JOIN users u ON a.dentist_id = u.id
+'''
+
+# The appointment id, then the list's display columns in Treeview order: time, patient, treatment, status
+_SQL_SELECT_APPOINTMENT_LIST_ROWS = '''
+    SELECT a.id, COALESCE(a.appointment_time, 'N/A'), p.first_name || ' ' || p.last_name,
+           COALESCE(a.appointment_type, 'General Checkup'), COALESCE(a.status, 'scheduled')
+    FROM appointments a
+    JOIN patients p ON a.patient_id = p.id
+'''
+
+_SQL_UPDATE_APPOINTMENT_STATUS = '''
+    UPDATE appointments 
+    SET status = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_INSERT_TREATMENT = '''
+    INSERT INTO treatments (name, description, category, duration, base_cost, created_by)
+    VALUES (?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_SQL_GET_TREATMENTS = 'SELECT * FROM treatments WHERE is_active = 1 ORDER BY name'
+
+_SQL_INSERT_TREATMENT_RECORD = '''
+    INSERT INTO treatment_records (patient_id, treatment_id, appointment_id, dentist_id,
+                                 treatment_date, treatment_notes, actual_cost, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_SQL_INSERT_INVOICE = '''
+    INSERT INTO invoices (invoice_number, patient_id, treatment_record_id, appointment_id,
+                        subtotal, tax_amount, discount_amount, total_amount,
+                        invoice_date, due_date, payment_terms, notes, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_SQL_UPDATE_INVOICE_STATUS = '''
+    UPDATE invoices 
+    SET status = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+_SQL_INSERT_INVOICE_ITEM = '''
+    INSERT INTO invoice_items (invoice_id, treatment_record_id, description,
+                             quantity, unit_price, total_price)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_PAYMENT = '''
+    INSERT INTO payments (invoice_id, payment_date, payment_amount, payment_method,
+                        payment_reference, notes, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
+_PAYMENT_COLUMNS = (
+    'invoice_id', 'payment_date', 'payment_amount', 'payment_method',
+    'payment_reference', 'notes', 'created_by'
+)
+
+_SQL_INSERT_PAYMENT_ROW = '''
+    INSERT INTO payments (invoice_id, payment_date, payment_amount, payment_method,
+                        payment_reference, notes, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Payment listings leave out the created_by/created_at audit columns; the
+# per-invoice one also drops invoice_id, which the caller already has
+_SQL_GET_PAYMENTS = '''
+    SELECT id, invoice_id, payment_date, payment_amount, payment_method, payment_reference, notes
+    FROM payments ORDER BY payment_date DESC
+'''
+
+_SQL_GET_PAYMENTS_FOR_INVOICE = '''
+    SELECT id, payment_date, payment_amount, payment_method, payment_reference, notes
+    FROM payments WHERE invoice_id = ? ORDER BY payment_date DESC
+'''
+
+# Answered from idx_payments_invoice_summary alone, without touching the table rows
+_SQL_GET_PAYMENT_SUMMARY = '''
+    SELECT TOTAL(payment_amount), COUNT(*), MAX(payment_date)
+    FROM payments WHERE invoice_id = ?
+'''
+
+
+def _chunked_multi_insert(conn: sqlite3.Connection, table: str, columns: tuple,
+                          rows: List[tuple], chunk: int = 50) -> int:
+    """
+    Insert rows using multi-row VALUES statements
+    
+    Args:
+        conn: Connection with an open transaction
+        table: Target table name (trusted, never user input)
+        columns: Column names matching each row tuple
+        rows: Parameter tuples to insert
+        chunk: Maximum number of rows per statement
+        
+    Returns:
+        int: Number of rows inserted
+    """
+    chunk = max(1, min(chunk, SQLITE_MAX_VARIABLES // len(columns)))
+    column_list = ', '.join(columns)
+    row_placeholder = '(' + ', '.join('?' * len(columns)) + ')'
+    full_sql = None
+    
+    for start in range(0, len(rows), chunk):
+        batch = rows[start:start + chunk]
+        if len(batch) == chunk and full_sql is not None:
+            sql = full_sql
+        else:
+            sql = f"INSERT INTO {table} ({column_list}) VALUES " + ', '.join([row_placeholder] * len(batch))
+            if len(batch) == chunk:
+                full_sql = sql  # Reuse the same string so the statement cache hits
+        conn.execute(sql, list(chain.from_iterable(batch)))
+    
+    return len(rows)
+
+
+def _column_names(cursor: sqlite3.Cursor) -> tuple:
+    """Column names of an executed cursor, read once per query"""
+    return tuple(column[0] for column in cursor.description)
+
+
+def _fetch_dict(cursor: sqlite3.Cursor) -> Optional[Dict[str, Any]]:
+    """Fetch one plain-tuple row from an executed cursor as a dict"""
+    row = cursor.fetchone()
+    return dict(zip(_column_names(cursor), row)) if row else None
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Fetch all plain-tuple rows from an executed cursor as dicts"""
+    columns = _column_names(cursor)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _stream_rows(cursor: sqlite3.Cursor) -> Iterator[Dict[str, Any]]:
+    """Yield rows from an executed cursor as dicts, fetching in batches"""
+    cursor.arraysize = FETCH_BATCH_SIZE
+    try:
+        columns = _column_names(cursor)
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        cursor.close()
+
+
+def _fts_prefix_query(search_term: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every word as a name prefix"""
+    tokens = search_term.split()
+    if not tokens:
+        return None
+    # Quote each token so FTS5 operators typed by the user are treated as text
+    return ' AND '.join('"' + token.replace('"', '""') + '"*' for token in tokens)
+
+
+def _iso_date(value) -> str:
+    """Normalize a date, datetime or ISO string to a YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date_type):
+        return value.isoformat()
+    return str(value)
+
+
+def _next_iso_date(value) -> Optional[str]:
+    """Return the ISO date after value, or None if value is not a valid date"""
+    try:
+        return (date_type.fromisoformat(_iso_date(value)) + timedelta(days=1)).isoformat()
+    except ValueError:
+        return None
+
+
+def _appointment_query(select_sql: str, date=None, patient_id: int = None,
+                       date_from=None, date_to=None, after: Optional[tuple] = None,
+                       limit: Optional[int] = None) -> Tuple[str, list]:
+    """Add iter_appointments' filters, ordering and limit to an appointments SELECT"""
+    conditions = []
+    params = []
+    
+    if date:
+        date_from = _iso_date(date)
+        date_to = _next_iso_date(date)
+        if date_to is None:
+            # Not a real date, so nothing can match a range; keep exact comparison
+            conditions.append('a.appointment_date = ?')
+            params.append(date_from)
+            date_from = None
+    
+    # Half-open range so idx_appointments_date_time is range-scanned
+    if date_from:
+        conditions.append('a.appointment_date >= ?')
+        params.append(_iso_date(date_from))
+    if date_to:
+        conditions.append('a.appointment_date < ?')
+        params.append(_iso_date(date_to))
+    if patient_id:
+        conditions.append('a.patient_id = ?')
+        params.append(patient_id)
+    if after:
+        # Keyset pagination: continue from the last row already shown
+        conditions.append('(a.appointment_date, a.appointment_time, a.id) > (?, ?, ?)')
+        params.extend(after)
+    
+    query = select_sql
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY a.appointment_date, a.appointment_time, a.id'
+    if limit:
+        query += ' LIMIT ?'
+        params.append(limit)
+    
+    return query, params
+
+
+def _patient_params(patient_data: Dict[str, Any]) -> tuple:
+    """Build the parameter tuple for _SQL_INSERT_PATIENT"""
+    return (
+        patient_data['first_name'],
+        patient_data['last_name'],
+        patient_data.get('date_of_birth'),
+        patient_data.get('gender'),
+        patient_data.get('phone'),
+        patient_data.get('email'),
+        patient_data.get('address'),
+        patient_data.get('city'),
+        patient_data.get('state'),
+        patient_data.get('postal_code'),
+        patient_data.get('emergency_contact_name'),
+        patient_data.get('emergency_contact_phone'),
+        patient_data.get('emergency_contact_relationship'),
+        patient_data.get('medical_history'),
+        patient_data.get('allergies'),
+        patient_data.get('insurance_provider'),
+        patient_data.get('insurance_number'),
+        patient_data.get('insurance_group_number'),
+        patient_data.get('created_by')
+    )
+
+
+def _treatment_record_params(record_data: Dict[str, Any]) -> tuple:
+    """Build the parameter tuple for _SQL_INSERT_TREATMENT_RECORD"""
+    return (
+        record_data['patient_id'],
+        record_data['treatment_id'],
+        record_data.get('appointment_id'),
+        record_data.get('dentist_id'),
+        record_data['treatment_date'],
+        record_data.get('treatment_notes'),
+        record_data['actual_cost'],
+        record_data.get('created_by')
+    )
+
+
+def _invoice_params(invoice_data: Dict[str, Any]) -> tuple:
+    """Build the parameter tuple for _SQL_INSERT_INVOICE"""
+    return (
+        invoice_data['invoice_number'],
+        invoice_data['patient_id'],
+        invoice_data.get('treatment_record_id'),
+        invoice_data.get('appointment_id'),
+        invoice_data.get('subtotal', 0.0),
+        invoice_data.get('tax_amount', 0.0),
+        invoice_data.get('discount_amount', 0.0),
+        invoice_data.get('total_amount', 0.0),
+        invoice_data['invoice_date'],
+        invoice_data['due_date'],
+        invoice_data.get('payment_terms', 'Net 30'),
+        invoice_data.get('notes'),
+        invoice_data.get('created_by')
+    )
+
+
+def _invoice_item_params(item_data: Dict[str, Any]) -> tuple:
+    """Build the parameter tuple for _SQL_INSERT_INVOICE_ITEM"""
+    quantity = item_data.get('quantity', 1)
+    return (
+        item_data['invoice_id'],
+        item_data.get('treatment_record_id'),
+        item_data['description'],
+        quantity,
+        item_data['unit_price'],
+        item_data.get('total_price', quantity * item_data['unit_price'])
+    )
+
+
+def _payment_params(payment_data: Dict[str, Any]) -> tuple:
+    """Build the parameter tuple for _SQL_INSERT_PAYMENT"""
+    return (
+        payment_data['invoice_id'],
+        payment_data['payment_date'],
+        payment_data['payment_amount'],
+        payment_data['payment_method'],
+        payment_data.get('payment_reference'),
+        payment_data.get('notes'),
+        payment_data.get('created_by')
+    )
+
 class DatabaseManager:
     """Manages SQLite database operations for the dental clinic system"""
     
-    def __init__(self, db_path: str = "dental_clinic.db"):
+    def __init__(self, db_path: str = "dental_clinic.db", pool_size: int = 5):
         """Initialize database manager with database file path"""
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         
-    def get_connection(self) -> sqlite3.Connection:
-        """Get a database connection"""
+        # SQLite allows one writer at a time but, under WAL, any number of readers.
+        # Long-lived connections are kept hot so SQLite's page cache survives between calls.
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self.pool_size = pool_size
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def _create_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new long-lived database connection"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable column access by name
+            if read_only:
+                database = Path(os.path.abspath(self.db_path)).as_uri() + '?mode=ro'
+                pragmas = READER_PRAGMAS
+            else:
+                database = self.db_path
+                pragmas = CONNECTION_PRAGMAS
+            conn = sqlite3.connect(
+                database,
+                uri=read_only,
+                timeout=BUSY_TIMEOUT,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                isolation_level=None  # Autocommit; multi-statement work uses explicit BEGIN
+            )
+            if not read_only:
+                # Callers borrowing the writer rely on column access by name; readers
+                # return plain tuples that the query helpers zip into dicts themselves
+                conn.row_factory = sqlite3.Row
+            for pragma in pragmas:
+                conn.execute(pragma)
             return conn
         except sqlite3.Error as e:
             self.logger.error(f"Database connection error: {e}")
             raise
     
+    def _get_writer(self) -> sqlite3.Connection:
+        """Return the writer connection, opening it on first use"""
+        if self._writer is None:
+            with self._pool_lock:
+                if self._writer is None:
+                    self._writer = self._create_connection()
+        return self._writer
+    
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take a reader from the pool, opening one if the pool is not yet full"""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        
+        # The writer creates the database file and switches it to WAL before any reader opens it
+        self._get_writer()
+        with self._pool_lock:
+            if len(self._reader_connections) < self.pool_size:
+                conn = self._create_connection(read_only=True)
+                self._reader_connections.append(conn)
+                return conn
+        
+        return self._readers.get()
+    
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection for the duration of a with block"""
+        with self._writer_lock:
+            conn = self._get_writer()
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+    
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled read-only connection for the duration of a with block"""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+    
+    def close(self):
+        """Close the writer and all pooled readers"""
+        with self._pool_lock:
+            connections = self._reader_connections + ([self._writer] if self._writer else [])
+            for conn in connections:
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Error closing database connection: {e}")
+            self._reader_connections.clear()
+            self._writer = None
+        
+        # Drain the idle queue so closed connections are never handed out again
+        while True:
+            try:
+                self._readers.get_nowait()
+            except queue.Empty:
+                break
+    
+    def _get_rows_by_ids(self, table: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Fetch rows of a trusted table by primary key with batched IN queries"""
+        unique_ids = list(dict.fromkeys(ids))
+        rows_by_id = {}
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(unique_ids), SQLITE_MAX_VARIABLES):
+                batch = unique_ids[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ','.join('?' * len(batch))
+                cursor.execute(f'SELECT * FROM {table} WHERE id IN ({placeholders})', batch)
+                for row in _fetch_dicts(cursor):
+                    rows_by_id[row['id']] = row
+        return rows_by_id
+    
+    def _update_statuses(self, table: str, updates: Dict[int, str]) -> int:
+        """Set the status of many rows of a trusted table with batched CASE updates"""
+        items = list(updates.items())
+        # Each row binds three parameters: id and status for the CASE, id again for the IN list
+        batch_size = SQLITE_MAX_VARIABLES // 3
+        updated = 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                cases = ' '.join('WHEN ? THEN ?' for _ in batch)
+                placeholders = ','.join('?' * len(batch))
+                params = list(chain.from_iterable(batch))
+                params.extend(row_id for row_id, _ in batch)
+                cursor.execute(f'''
+                    UPDATE {table}
+                    SET status = CASE id {cases} END,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({placeholders})
+                ''', params)
+                updated += cursor.rowcount
+            conn.commit()
+        return updated
+    
     def initialize_database(self):
         """Create database tables if they don't exist"""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Create users table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT UNIQUE NOT NULL,
-                        password_hash TEXT NOT NULL,
-                        first_name TEXT NOT NULL,
-                        last_name TEXT NOT NULL,
-                        email TEXT UNIQUE NOT NULL,
-                        role TEXT NOT NULL DEFAULT 'staff',
-                        is_active BOOLEAN DEFAULT 1,
-                        last_login TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        CHECK (role IN ('admin', 'dentist', 'hygienist', 'receptionist', 'staff'))
-                    )
-                ''')
+                # Skip the whole script once this schema version has been applied
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+                    self.logger.info("Database schema is up to date")
+                    return
                 
-                # Create patients table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS patients (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        first_name TEXT NOT NULL,
-                        last_name TEXT NOT NULL,
-                        date_of_birth DATE,
-                        gender TEXT CHECK (gender IN ('male', 'female', 'other', 'prefer_not_to_say')),
-                        phone TEXT,
-                        email TEXT,
-                        address TEXT,
-                        city TEXT,
-                        state TEXT,
-                        postal_code TEXT,
-                        emergency_contact_name TEXT,
-                        emergency_contact_phone TEXT,
-                        emergency_contact_relationship TEXT,
-                        medical_history TEXT,
-                        allergies TEXT,
-                        insurance_provider TEXT,
-                        insurance_number TEXT,
-                        insurance_group_number TEXT,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (created_by) REFERENCES users (id)
-                    )
-                ''')
+                fts_exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'patients_fts'"
+                ).fetchone() is not None
                 
-                # Create appointments table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS appointments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        patient_id INTEGER NOT NULL,
-                        dentist_id INTEGER,
-                        appointment_date DATE NOT NULL,
-                        appointment_time TIME NOT NULL,
-                        duration INTEGER DEFAULT 60,
-                        appointment_type TEXT DEFAULT 'checkup',
-                        treatment_plan TEXT,
-                        notes TEXT,
-                        status TEXT DEFAULT 'scheduled',
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (patient_id) REFERENCES patients (id),
-                        FOREIGN KEY (dentist_id) REFERENCES users (id),
-                        FOREIGN KEY (created_by) REFERENCES users (id),
-                        CHECK (status IN ('scheduled', 'confirmed', 'in_progress', 'completed', 'cancelled', 'no_show')),
-                        CHECK (appointment_type IN ('checkup', 'cleaning', 'filling', 'extraction', 'root_canal', 'crown', 'consultation', 'emergency', 'follow_up'))
-                    )
-                ''')
+                script = _SCHEMA_SQL
+                user_columns = {row['name'] for row in conn.execute('PRAGMA table_info(users)')}
+                if not user_columns or {'first_name', 'last_name', 'is_active'} <= user_columns:
+                    script += _SQL_CREATE_DENTISTS_INDEX
+                if not fts_exists:
+                    # Index patients that existed before the full-text table was added
+                    script += "\nINSERT INTO patients_fts (patients_fts) VALUES ('rebuild');"
                 
-                # Create treatments table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS treatments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        description TEXT,
-                        category TEXT DEFAULT 'general',
-                        duration INTEGER DEFAULT 60,
-                        base_cost REAL NOT NULL,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (created_by) REFERENCES users (id),
-                        CHECK (category IN ('preventive', 'restorative', 'cosmetic', 'surgical', 'emergency', 'general'))
-                    )
-                ''')
-                
-                # Create treatment_records table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS treatment_records (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        patient_id INTEGER NOT NULL,
-                        treatment_id INTEGER NOT NULL,
-                        appointment_id INTEGER,
-                        dentist_id INTEGER,
-                        treatment_date DATE NOT NULL,
-                        treatment_notes TEXT,
-                        actual_cost REAL NOT NULL,
-                        payment_status TEXT DEFAULT 'pending',
-                        completed_at TIMESTAMP,
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (patient_id) REFERENCES patients (id),
-                        FOREIGN KEY (treatment_id) REFERENCES treatments (id),
-                        FOREIGN KEY (appointment_id) REFERENCES appointments (id),
-                        FOREIGN KEY (dentist_id) REFERENCES users (id),
-                        FOREIGN KEY (created_by) REFERENCES users (id),
-                        CHECK (payment_status IN ('pending', 'partial', 'paid', 'overdue', 'cancelled'))
-                    )
-                ''')
-                
-                # Create invoices table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS invoices (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        invoice_number TEXT UNIQUE NOT NULL,
-                        patient_id INTEGER NOT NULL,
-                        treatment_record_id INTEGER,
-                        appointment_id INTEGER,
-                        subtotal REAL NOT NULL DEFAULT 0.0,
-                        tax_amount REAL NOT NULL DEFAULT 0.0,
-                        discount_amount REAL NOT NULL DEFAULT 0.0,
-                        total_amount REAL NOT NULL DEFAULT 0.0,
-                        amount_paid REAL NOT NULL DEFAULT 0.0,
-                        balance_due REAL NOT NULL DEFAULT 0.0,
-                        invoice_date DATE NOT NULL,
-                        due_date DATE NOT NULL,
-                        status TEXT DEFAULT 'pending',
-                        payment_terms TEXT DEFAULT 'Net 30',
-                        notes TEXT,
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (patient_id) REFERENCES patients (id),
-                        FOREIGN KEY (treatment_record_id) REFERENCES treatment_records (id),
-                        FOREIGN KEY (appointment_id) REFERENCES appointments (id),
-                        FOREIGN KEY (created_by) REFERENCES users (id),
-                        CHECK (status IN ('draft', 'sent', 'paid', 'overdue', 'cancelled', 'refunded'))
-                    )
-                ''')
-                
-                # Create invoice_items table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS invoice_items (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        invoice_id INTEGER NOT NULL,
-                        treatment_record_id INTEGER,
-                        description TEXT NOT NULL,
-                        quantity INTEGER NOT NULL DEFAULT 1,
-                        unit_price REAL NOT NULL,
-                        total_price REAL NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (invoice_id) REFERENCES invoices (id),
-                        FOREIGN KEY (treatment_record_id) REFERENCES treatment_records (id)
-                    )
-                ''')
-                
-                # Create payments table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS payments (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        invoice_id INTEGER NOT NULL,
-                        payment_date DATE NOT NULL,
-                        payment_amount REAL NOT NULL,
-                        payment_method TEXT NOT NULL,
-                        payment_reference TEXT,
-                        notes TEXT,
-                        created_by INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (invoice_id) REFERENCES invoices (id),
-                        FOREIGN KEY (created_by) REFERENCES users (id),
-                        CHECK (payment_method IN ('cash', 'credit_card', 'debit_card', 'check', 'insurance', 'online', 'other'))
-                    )
-                ''')
-                
-                # Create indexes for better performance
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(last_name, first_name)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments(patient_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_treatment_records_patient ON treatment_records(patient_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_invoices_patient ON invoices(patient_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_payments_invoice ON payments(invoice_id)')
-                
-                conn.commit()
+                # One transaction so the schema pages are written once
+                conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {SCHEMA_VERSION};\nCOMMIT;")
                 self.logger.info("Database tables created successfully")
                 
         except sqlite3.Error as e:
@@ -234,30 +895,30 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO users (username, password_hash, first_name, last_name, email, role)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+                row = cursor.execute(_SQL_INSERT_USER, (
                     user_data['username'],
                     user_data['password_hash'],
                     user_data['first_name'],
                     user_data['last_name'],
                     user_data['email'],
                     user_data.get('role', 'staff')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                )).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding user: {e}")
             raise
     
     def get_users(self) -> List[Dict[str, Any]]:
         """Get all users"""
+        return list(self.iter_users())
+    
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        """Stream all users, one dict at a time"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM users ORDER BY last_name, first_name')
-                return [dict(row) for row in cursor.fetchall()]
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting users: {e}")
             raise
@@ -265,22 +926,29 @@ class DatabaseManager:
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific user by ID"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-                row = cursor.fetchone()
-                return dict(row) if row else None
+                cursor.execute(_SQL_GET_USER_BY_ID, (user_id,))
+                return _fetch_dict(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting user by ID: {e}")
             raise
     
+    def get_users_by_ids(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get several users by ID in one query, keyed by ID"""
+        try:
+            return self._get_rows_by_ids('users', user_ids)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting users by IDs: {e}")
+            raise
+    
     def get_dentists(self) -> List[Dict[str, Any]]:
         """Get all dentists"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users WHERE role = "dentist" AND is_active = 1 ORDER BY last_name, first_name')
-                return [dict(row) for row in cursor.fetchall()]
+                cursor.execute(_SQL_GET_USERS_BY_ROLE, ('dentist',))
+                return _fetch_dicts(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting dentists: {e}")
             raise
@@ -291,52 +959,42 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO patients (first_name, last_name, date_of_birth, gender, phone, email, 
-                                        address, city, state, postal_code, emergency_contact_name,
-                                        emergency_contact_phone, emergency_contact_relationship,
-                                        medical_history, allergies, insurance_provider,
-                                        insurance_number, insurance_group_number, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    patient_data['first_name'],
-                    patient_data['last_name'],
-                    patient_data.get('date_of_birth'),
-                    patient_data.get('gender'),
-                    patient_data.get('phone'),
-                    patient_data.get('email'),
-                    patient_data.get('address'),
-                    patient_data.get('city'),
-                    patient_data.get('state'),
-                    patient_data.get('postal_code'),
-                    patient_data.get('emergency_contact_name'),
-                    patient_data.get('emergency_contact_phone'),
-                    patient_data.get('emergency_contact_relationship'),
-                    patient_data.get('medical_history'),
-                    patient_data.get('allergies'),
-                    patient_data.get('insurance_provider'),
-                    patient_data.get('insurance_number'),
-                    patient_data.get('insurance_group_number'),
-                    patient_data.get('created_by')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                row = cursor.execute(_SQL_INSERT_PATIENT, _patient_params(patient_data)).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding patient: {e}")
             raise
     
+    def add_patients_bulk(self, rows: List[Dict[str, Any]]) -> int:
+        """Add many patients in a single transaction, returning the number inserted"""
+        params_list = [_patient_params(row) for row in rows]
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                if len(params_list) > MULTI_INSERT_THRESHOLD:
+                    _chunked_multi_insert(conn, 'patients', _PATIENT_COLUMNS, params_list)
+                else:
+                    cursor.executemany(_SQL_INSERT_PATIENT, params_list)
+                conn.commit()
+                return len(params_list)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error bulk adding patients: {e}")
+            raise
+    
     def get_patients(self, search_term: str = None) -> List[Dict[str, Any]]:
         """Get all patients or search by name"""
+        return list(self.iter_patients(search_term))
+    
+    def iter_patients(self, search_term: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream all patients or search by name, one dict at a time"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
                 
-                if search_term:
-                    cursor.execute('''
-                        SELECT * FROM patients 
-                        WHERE (first_name LIKE ? OR last_name LIKE ?) AND is_active = 1
-                        ORDER BY last_name, first_name
-                    ''', (f'%{search_term}%', f'%{search_term}%'))
+                match_query = _fts_prefix_query(search_term) if search_term else None
+                if match_query:
+                    cursor.execute(_SQL_SEARCH_PATIENTS, (match_query,))
                 else:
                     cursor.execute('''
                         SELECT * FROM patients 
@@ -344,59 +1002,78 @@ class DatabaseManager:
                         ORDER BY last_name, first_name
                     ''')
                 
-                return [dict(row) for row in cursor.fetchall()]
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting patients: {e}")
             raise
     
+    def list_patients_summary(self, search_term: str = None) -> List[Dict[str, Any]]:
+        """Get id, name, phone and email of active patients for list views"""
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                
+                match_query = _fts_prefix_query(search_term) if search_term else None
+                if match_query:
+                    cursor.execute(_SQL_SEARCH_PATIENTS_SUMMARY, (match_query,))
+                else:
+                    cursor.execute(_SQL_LIST_PATIENTS_SUMMARY)
+                
+                return list(_stream_rows(cursor))
+        except sqlite3.Error as e:
+            self.logger.error(f"Error listing patients: {e}")
+            raise
+    
     def get_patient_by_id(self, patient_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific patient by ID"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM patients WHERE id = ?', (patient_id,))
-                row = cursor.fetchone()
-                return dict(row) if row else None
+                cursor.execute(_SQL_GET_PATIENT_BY_ID, (patient_id,))
+                return _fetch_dict(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting patient by ID: {e}")
             raise
     
+    def get_patients_by_ids(self, patient_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get several patients by ID in one query, keyed by ID"""
+        try:
+            return self._get_rows_by_ids('patients', patient_ids)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting patients by IDs: {e}")
+            raise
+    
     def update_patient(self, patient_id: int, patient_data: Dict[str, Any]) -> bool:
-        """Update patient information"""
+        """Update patient information; fields missing from patient_data or set to None are kept"""
+        details = (
+            patient_data.get('date_of_birth'),
+            patient_data.get('gender'),
+            patient_data.get('phone'),
+            patient_data.get('email'),
+            patient_data.get('address'),
+            patient_data.get('city'),
+            patient_data.get('state'),
+            patient_data.get('postal_code'),
+            patient_data.get('emergency_contact_name'),
+            patient_data.get('emergency_contact_phone'),
+            patient_data.get('emergency_contact_relationship'),
+            patient_data.get('medical_history'),
+            patient_data.get('allergies'),
+            patient_data.get('insurance_provider'),
+            patient_data.get('insurance_number'),
+            patient_data.get('insurance_group_number'),
+            patient_id
+        )
+        first_name = patient_data.get('first_name')
+        last_name = patient_data.get('last_name')
+        
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE patients 
-                    SET first_name = ?, last_name = ?, date_of_birth = ?, gender = ?, phone = ?, 
-                        email = ?, address = ?, city = ?, state = ?, postal_code = ?,
-                        emergency_contact_name = ?, emergency_contact_phone = ?, 
-                        emergency_contact_relationship = ?, medical_history = ?, allergies = ?,
-                        insurance_provider = ?, insurance_number = ?, insurance_group_number = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (
-                    patient_data['first_name'],
-                    patient_data['last_name'],
-                    patient_data.get('date_of_birth'),
-                    patient_data.get('gender'),
-                    patient_data.get('phone'),
-                    patient_data.get('email'),
-                    patient_data.get('address'),
-                    patient_data.get('city'),
-                    patient_data.get('state'),
-                    patient_data.get('postal_code'),
-                    patient_data.get('emergency_contact_name'),
-                    patient_data.get('emergency_contact_phone'),
-                    patient_data.get('emergency_contact_relationship'),
-                    patient_data.get('medical_history'),
-                    patient_data.get('allergies'),
-                    patient_data.get('insurance_provider'),
-                    patient_data.get('insurance_number'),
-                    patient_data.get('insurance_group_number'),
-                    patient_id
-                ))
-                conn.commit()
+                if first_name is None and last_name is None:
+                    cursor.execute(_SQL_UPDATE_PATIENT_DETAILS, details)
+                else:
+                    cursor.execute(_SQL_UPDATE_PATIENT, (first_name, last_name) + details)
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
             self.logger.error(f"Error updating patient: {e}")
@@ -408,11 +1085,7 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO appointments (patient_id, dentist_id, appointment_date, appointment_time, 
-                                            duration, appointment_type, treatment_plan, notes, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                row = cursor.execute(_SQL_INSERT_APPOINTMENT, (
                     appointment_data['patient_id'],
                     appointment_data.get('dentist_id'),
                     appointment_data['appointment_date'],
@@ -422,66 +1095,126 @@ class DatabaseManager:
                     appointment_data.get('treatment_plan'),
                     appointment_data.get('notes'),
                     appointment_data.get('created_by')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                )).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding appointment: {e}")
             raise
     
-    def get_appointments(self, date: str = None, patient_id: int = None) -> List[Dict[str, Any]]:
-        """Get appointments with optional filtering"""
+    def get_appointments(self, date=None, patient_id: int = None,
+                         date_from=None, date_to=None, after: Optional[tuple] = None,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get appointments with optional filtering (see iter_appointments)"""
+        return list(self.iter_appointments(date, patient_id, date_from, date_to, after, limit))
+    
+    def iter_appointments(self, date=None, patient_id: int = None,
+                          date_from=None, date_to=None, after: Optional[tuple] = None,
+                          limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream appointments with optional filtering
+        
+        Args:
+            date: Single day to list (shorthand for date_from=date, date_to=date + 1 day)
+            patient_id: Only appointments for this patient
+            date_from: Inclusive lower bound on appointment_date
+            date_to: Exclusive upper bound on appointment_date
+            after: (appointment_date, appointment_time, id) of the last row of the
+                previous page; only later appointments are returned
+            limit: Maximum number of appointments to return
+            
+        Returns:
+            Appointments ordered by date and time, one dict at a time
+        """
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
                 
-                query = '''
-                    SELECT a.*, p.first_name, p.last_name, u.username as dentist_name
-                    FROM appointments a
-                    JOIN patients p ON a.patient_id = p.id
-                    LEFT JOIN users u ON a.dentist_id = u.id
-                '''
-                params = []
-                
-                if date:
-                    query += ' WHERE a.appointment_date = ?'
-                    params.append(date)
-                elif patient_id:
-                    query += ' WHERE a.patient_id = ?'
-                    params.append(patient_id)
-                
-                query += ' ORDER BY a.appointment_date, a.appointment_time'
-                
+                query, params = _appointment_query(
+                    _SQL_SELECT_APPOINTMENTS, date, patient_id, date_from, date_to, after, limit
+                )
                 cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting appointments: {e}")
             raise
     
+    def get_appointment_list_rows(self, date=None, patient_id: int = None,
+                                  date_from=None, date_to=None) -> List[tuple]:
+        """
+        Get (id, time, patient name, treatment, status) tuples for an appointment list
+        
+        Takes the same filters as iter_appointments but skips building a
+        dict per row, for display code that only needs these columns.
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                query, params = _appointment_query(
+                    _SQL_SELECT_APPOINTMENT_LIST_ROWS, date, patient_id, date_from, date_to
+                )
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting appointment list rows: {e}")
+            raise
+    
+    def count_appointments(self, status: str = None) -> int:
+        """Count appointments, optionally only those with the given status"""
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                if status:
+                    cursor.execute(_SQL_COUNT_APPOINTMENTS_BY_STATUS, (status,))
+                else:
+                    cursor.execute(_SQL_COUNT_APPOINTMENTS)
+                return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            self.logger.error(f"Error counting appointments: {e}")
+            raise
+    
     def update_appointment_status(self, appointment_id: int, status: str) -> bool:
         """Update appointment status"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE appointments 
-                    SET status = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (status, appointment_id))
-                conn.commit()
+                cursor.execute(_SQL_UPDATE_APPOINTMENT_STATUS, (status, appointment_id))
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
             self.logger.error(f"Error updating appointment status: {e}")
             raise
     
+    def update_appointment_statuses(self, updates: Dict[int, str]) -> int:
+        """Update the status of several appointments at once, returning the number changed"""
+        try:
+            return self._update_statuses('appointments', updates)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error updating appointment statuses: {e}")
+            raise
+    
     # Treatment Management Methods
+    def get_dashboard_counts(self) -> Dict[str, int]:
+        """Count active patients, scheduled appointments and active treatments in one query"""
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SQL_DASHBOARD_COUNTS)
+                total_patients, pending_appointments, total_treatments = cursor.fetchone()
+                return {
+                    'total_patients': total_patients,
+                    'pending_appointments': pending_appointments,
+                    'total_treatments': total_treatments
+                }
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting dashboard counts: {e}")
+            raise
+    
     def get_treatments(self) -> List[Dict[str, Any]]:
         """Get all available treatments"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM treatments WHERE is_active = 1 ORDER BY name')
-                return [dict(row) for row in cursor.fetchall()]
+                cursor.execute(_SQL_GET_TREATMENTS)
+                return _fetch_dicts(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting treatments: {e}")
             raise
@@ -491,19 +1224,15 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO treatments (name, description, category, duration, base_cost, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
+                row = cursor.execute(_SQL_INSERT_TREATMENT, (
                     treatment_data['name'],
                     treatment_data.get('description'),
                     treatment_data.get('category', 'general'),
                     treatment_data.get('duration', 60),
                     treatment_data['base_cost'],
                     treatment_data.get('created_by')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                )).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding treatment: {e}")
             raise
@@ -513,40 +1242,72 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO treatment_records (patient_id, treatment_id, appointment_id, dentist_id,
-                                                 treatment_date, treatment_notes, actual_cost, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    record_data['patient_id'],
-                    record_data['treatment_id'],
-                    record_data.get('appointment_id'),
-                    record_data.get('dentist_id'),
-                    record_data['treatment_date'],
-                    record_data.get('treatment_notes'),
-                    record_data['actual_cost'],
-                    record_data.get('created_by')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                row = cursor.execute(_SQL_INSERT_TREATMENT_RECORD, _treatment_record_params(record_data)).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding treatment record: {e}")
             raise
     
-    def get_patient_treatment_history(self, patient_id: int) -> List[Dict[str, Any]]:
-        """Get treatment history for a specific patient"""
+    def add_treatment_records_bulk(self, rows: List[Dict[str, Any]]) -> int:
+        """Add many treatment records in a single transaction, returning the number inserted"""
+        params_list = [_treatment_record_params(row) for row in rows]
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
+                cursor.execute('BEGIN')
+                cursor.executemany(_SQL_INSERT_TREATMENT_RECORD, params_list)
+                conn.commit()
+                return len(params_list)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error bulk adding treatment records: {e}")
+            raise
+    
+    def get_patient_treatment_history(self, patient_id: int, before_date: str = None,
+                                      before_id: int = None,
+                                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get treatment history for a specific patient"""
+        return list(self.iter_patient_treatment_history(patient_id, before_date, before_id, limit))
+    
+    def iter_patient_treatment_history(self, patient_id: int, before_date: str = None,
+                                       before_id: int = None,
+                                       limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream treatment history for a specific patient, newest first
+        
+        Args:
+            patient_id: Patient whose records to list
+            before_date: treatment_date of the last row of the previous page
+            before_id: id of the last row of the previous page
+            limit: Maximum number of records to return
+            
+        Returns:
+            Treatment records, one dict at a time
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                
+                query = '''
                     SELECT tr.*, t.name as treatment_name, t.description, u.username as dentist_name
                     FROM treatment_records tr
                     JOIN treatments t ON tr.treatment_id = t.id
                     LEFT JOIN users u ON tr.dentist_id = u.id
                     WHERE tr.patient_id = ?
-                    ORDER BY tr.treatment_date DESC
-                ''', (patient_id,))
-                return [dict(row) for row in cursor.fetchall()]
+                '''
+                params = [patient_id]
+                
+                if before_date is not None and before_id is not None:
+                    # Keyset pagination: continue from the last row already shown
+                    query += ' AND (tr.treatment_date, tr.id) < (?, ?)'
+                    params.extend((before_date, before_id))
+                
+                query += ' ORDER BY tr.treatment_date DESC, tr.id DESC'
+                if limit:
+                    query += ' LIMIT ?'
+                    params.append(limit)
+                
+                cursor.execute(query, params)
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting patient treatment history: {e}")
             raise
@@ -557,56 +1318,120 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO invoices (invoice_number, patient_id, treatment_record_id, appointment_id,
-                                        subtotal, tax_amount, discount_amount, total_amount,
-                                        invoice_date, due_date, payment_terms, notes, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    invoice_data['invoice_number'],
-                    invoice_data['patient_id'],
-                    invoice_data.get('treatment_record_id'),
-                    invoice_data.get('appointment_id'),
-                    invoice_data.get('subtotal', 0.0),
-                    invoice_data.get('tax_amount', 0.0),
-                    invoice_data.get('discount_amount', 0.0),
-                    invoice_data.get('total_amount', 0.0),
-                    invoice_data['invoice_date'],
-                    invoice_data['due_date'],
-                    invoice_data.get('payment_terms', 'Net 30'),
-                    invoice_data.get('notes'),
-                    invoice_data.get('created_by')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+                row = cursor.execute(_SQL_INSERT_INVOICE, _invoice_params(invoice_data)).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding invoice: {e}")
             raise
     
-    def get_invoices(self, patient_id: int = None, status: str = None) -> List[Dict[str, Any]]:
-        """Get invoices with optional filtering"""
+    def add_invoice_items_bulk(self, rows: List[Dict[str, Any]]) -> int:
+        """Add many invoice line items in a single transaction, returning the number inserted"""
+        params_list = [_invoice_item_params(row) for row in rows]
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                cursor.executemany(_SQL_INSERT_INVOICE_ITEM, params_list)
+                conn.commit()
+                return len(params_list)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error bulk adding invoice items: {e}")
+            raise
+    
+    def create_invoice_with_items(self, invoice_data: Dict[str, Any], items: List[Dict[str, Any]],
+                                  payments: List[Dict[str, Any]] = None) -> int:
+        """
+        Create an invoice together with its line items and any up-front payments
+        
+        Everything is written in one transaction, so either the whole invoice
+        lands or none of it does.
+        
+        Args:
+            invoice_data: Invoice fields as accepted by add_invoice
+            items: Line items as accepted by add_invoice_items_bulk, without invoice_id
+            payments: Payments as accepted by add_payment, without invoice_id
+            
+        Returns:
+            ID of the new invoice
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                # Take the write lock up front rather than upgrading mid-transaction
+                cursor.execute('BEGIN IMMEDIATE')
+                invoice_id = cursor.execute(_SQL_INSERT_INVOICE, _invoice_params(invoice_data)).fetchone()[0]
+                
+                if items:
+                    cursor.executemany(_SQL_INSERT_INVOICE_ITEM, [
+                        _invoice_item_params({**item, 'invoice_id': invoice_id}) for item in items
+                    ])
+                
+                if payments:
+                    # payments_apply_insert updates the invoice totals
+                    cursor.executemany(_SQL_INSERT_PAYMENT_ROW, [
+                        _payment_params({**payment, 'invoice_id': invoice_id}) for payment in payments
+                    ])
+                
+                conn.commit()
+                return invoice_id
+        except sqlite3.Error as e:
+            self.logger.error(f"Error creating invoice with items: {e}")
+            raise
+    
+    def get_invoices(self, patient_id: int = None, status: str = None,
+                     before_date: str = None, before_id: int = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get invoices with optional filtering"""
+        return list(self.iter_invoices(patient_id, status, before_date, before_id, limit))
+    
+    def iter_invoices(self, patient_id: int = None, status: str = None,
+                      before_date: str = None, before_id: int = None,
+                      limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream invoices with optional filtering, newest first
+        
+        Args:
+            patient_id: Only invoices for this patient
+            status: Only invoices with this status (ignored when patient_id is given)
+            before_date: invoice_date of the last row of the previous page
+            before_id: id of the last row of the previous page
+            limit: Maximum number of invoices to return
+            
+        Returns:
+            Invoices, one dict at a time
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
                 
                 query = '''
                     SELECT i.*, p.first_name, p.last_name
                     FROM invoices i
                     JOIN patients p ON i.patient_id = p.id
                 '''
+                conditions = []
                 params = []
                 
                 if patient_id:
-                    query += ' WHERE i.patient_id = ?'
+                    conditions.append('i.patient_id = ?')
                     params.append(patient_id)
                 elif status:
-                    query += ' WHERE i.status = ?'
+                    conditions.append('i.status = ?')
                     params.append(status)
+                if before_date is not None and before_id is not None:
+                    # Keyset pagination: continue from the last row already shown
+                    conditions.append('(i.invoice_date, i.id) < (?, ?)')
+                    params.extend((before_date, before_id))
                 
-                query += ' ORDER BY i.invoice_date DESC'
+                if conditions:
+                    query += ' WHERE ' + ' AND '.join(conditions)
+                query += ' ORDER BY i.invoice_date DESC, i.id DESC'
+                if limit:
+                    query += ' LIMIT ?'
+                    params.append(limit)
                 
                 cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting invoices: {e}")
             raise
@@ -616,64 +1441,85 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE invoices 
-                    SET status = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (status, invoice_id))
-                conn.commit()
+                cursor.execute(_SQL_UPDATE_INVOICE_STATUS, (status, invoice_id))
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
             self.logger.error(f"Error updating invoice status: {e}")
             raise
     
+    def update_invoice_statuses(self, updates: Dict[int, str]) -> int:
+        """Update the status of several invoices at once, returning the number changed"""
+        try:
+            return self._update_statuses('invoices', updates)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error updating invoice statuses: {e}")
+            raise
+    
     # Payment Management Methods
     def add_payment(self, payment_data: Dict[str, Any]) -> int:
         """Add a new payment"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO payments (invoice_id, payment_date, payment_amount, payment_method,
-                                        payment_reference, notes, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    payment_data['invoice_id'],
-                    payment_data['payment_date'],
-                    payment_data['payment_amount'],
-                    payment_data['payment_method'],
-                    payment_data.get('payment_reference'),
-                    payment_data.get('notes'),
-                    payment_data.get('created_by')
-                ))
-                
-                # Update invoice amount_paid and balance_due
-                cursor.execute('''
-                    UPDATE invoices 
-                    SET amount_paid = amount_paid + ?, 
-                        balance_due = total_amount - (amount_paid + ?),
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (payment_data['payment_amount'], payment_data['payment_amount'], payment_data['invoice_id']))
-                
-                conn.commit()
-                return cursor.lastrowid
+                # payments_apply_insert updates amount_paid and balance_due in the same statement
+                row = cursor.execute(_SQL_INSERT_PAYMENT, _payment_params(payment_data)).fetchone()
+                return row[0]
         except sqlite3.Error as e:
             self.logger.error(f"Error adding payment: {e}")
             raise
     
+    def add_payments_bulk(self, payments: List[Dict[str, Any]]) -> int:
+        """Add many payments in a single transaction, returning the number inserted"""
+        params_list = [_payment_params(payment) for payment in payments]
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN')
+                if len(params_list) > MULTI_INSERT_THRESHOLD:
+                    _chunked_multi_insert(conn, 'payments', _PAYMENT_COLUMNS, params_list)
+                else:
+                    cursor.executemany(_SQL_INSERT_PAYMENT_ROW, params_list)
+                conn.commit()
+                return len(params_list)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error bulk adding payments: {e}")
+            raise
+    
     def get_payments(self, invoice_id: int = None) -> List[Dict[str, Any]]:
         """Get payments with optional filtering"""
+        return list(self.iter_payments(invoice_id))
+    
+    def iter_payments(self, invoice_id: int = None) -> Iterator[Dict[str, Any]]:
+        """Stream payments with optional filtering, one dict at a time"""
         try:
-            with self.get_connection() as conn:
+            with self.read_connection() as conn:
                 cursor = conn.cursor()
                 
                 if invoice_id:
-                    cursor.execute('SELECT * FROM payments WHERE invoice_id = ? ORDER BY payment_date DESC', (invoice_id,))
+                    cursor.execute(_SQL_GET_PAYMENTS_FOR_INVOICE, (invoice_id,))
                 else:
-                    cursor.execute('SELECT * FROM payments ORDER BY payment_date DESC')
+                    cursor.execute(_SQL_GET_PAYMENTS)
                 
-                return [dict(row) for row in cursor.fetchall()]
+                yield from _stream_rows(cursor)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting payments: {e}")
+            raise
+    
+    def get_payment_summary(self, invoice_id: int) -> Tuple[float, int, Optional[str]]:
+        """
+        Aggregate an invoice's payments in SQL instead of summing get_payments() rows
+        
+        Args:
+            invoice_id: Invoice whose payments are summarised
+            
+        Returns:
+            tuple: (total paid, number of payments, latest payment date or None)
+        """
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SQL_GET_PAYMENT_SUMMARY, (invoice_id,))
+                return cursor.fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error getting payment summary: {e}")
             raise 
\ No newline at end of file
@@ -5,51 +5,163 @@ Handles user registration, authentication, and database operations
 
 import sqlite3
 import hashlib
+import hmac
+import os
 import logging
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, Tuple, Union
+
+from .database_manager import DatabaseManager
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi is optional; salted scrypt from hashlib is used instead
+    PasswordHasher = None
+
+# Argon2id tuned for a few hundred milliseconds per interactive login
+_password_hasher = (
+    PasswordHasher(time_cost=2, memory_cost=47104, parallelism=1) if PasswordHasher else None
+)
+
+# Fallback scrypt cost (about 16 MB of memory per hash) and the prefix of its stored form
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+_SCRYPT_PREFIX = 'scrypt$'
+
+
+# SQL text is kept in constants so every call hits the connection's prepared statement cache
+_SQL_CREATE_USERS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL,
+        CHECK (role IN ('doctor', 'receptionist'))
+    )
+'''
+
+_SQL_COUNT_USERS = 'SELECT COUNT(*) FROM users'
+
+_SQL_INSERT_USER = '''
+    INSERT INTO users (username, password, role)
+    VALUES (?, ?, ?)
+'''
+
+# Seeding skips usernames that already exist instead of failing the whole batch
+_SQL_INSERT_DEFAULT_USER = '''
+    INSERT OR IGNORE INTO users (username, password, role)
+    VALUES (?, ?, ?)
+'''
+
+# The password hash is never handed back to callers
+_SQL_GET_USER_BY_USERNAME = 'SELECT id, username, role FROM users WHERE username = ?'
+
+# Login needs only these; the UNIQUE index on username makes it a single B-tree probe
+_SQL_GET_CREDENTIALS = 'SELECT id, username, role, password FROM users WHERE username = ?'
+
+_SQL_GET_ALL_USERS = 'SELECT id, username, role FROM users ORDER BY username'
+
+_SQL_UPDATE_USER_ROLE = 'UPDATE users SET role = ? WHERE username = ?'
+
+_SQL_DELETE_USER = 'DELETE FROM users WHERE username = ?'
+
+_SQL_UPDATE_PASSWORD = 'UPDATE users SET password = ? WHERE username = ?'
+
+_SQL_UPDATE_PASSWORD_BY_ID = 'UPDATE users SET password = ? WHERE id = ?'
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with Argon2id, or salted scrypt when argon2-cffi is not installed"""
+    if _password_hasher:
+        return _password_hasher.hash(password)
+    
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return f"{_SCRYPT_PREFIX}{SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(stored_hash: str, password: str) -> Tuple[bool, bool]:
+    """
+    Check a password against a stored hash
+    
+    Args:
+        stored_hash: Argon2id, scrypt or legacy unsalted SHA-256 hash
+        password: Plain text password to verify
+        
+    Returns:
+        tuple: (matches, needs_rehash) where needs_rehash means the hash
+        should be replaced with one from hash_password()
+    """
+    if stored_hash.startswith('$argon2'):
+        if not _password_hasher:
+            raise RuntimeError("argon2-cffi is required to verify this password hash")
+        try:
+            _password_hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False, False
+        return True, _password_hasher.check_needs_rehash(stored_hash)
+    
+    if stored_hash.startswith(_SCRYPT_PREFIX):
+        n, r, p, salt, digest = stored_hash[len(_SCRYPT_PREFIX):].split('$')
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=int(n), r=int(r), p=int(p))
+        matches = hmac.compare_digest(candidate.hex(), digest)
+        needs_rehash = _password_hasher is not None or (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return matches, matches and needs_rehash
+    
+    # Legacy unsalted SHA-256 hex digest
+    candidate = hashlib.sha256(password.encode()).hexdigest()
+    matches = hmac.compare_digest(candidate, stored_hash)
+    return matches, matches
+
 
 class UserManager:
     """Manages user accounts in the dental clinic system"""
     
-    def __init__(self, db_path: str = "clinic.db"):
-        self.db_path = db_path
+    def __init__(self, db: Union[DatabaseManager, str] = "clinic.db"):
+        """
+        Initialize the user manager
+        
+        Args:
+            db: DatabaseManager whose connections should be shared, or a
+                database file path to open a private one for
+        """
         self.logger = logging.getLogger(__name__)
+        self._owns_db = not isinstance(db, DatabaseManager)
+        self.db_manager = DatabaseManager(db) if self._owns_db else db
+        self.db_path = self.db_manager.db_path
     
-    def get_connection(self) -> sqlite3.Connection:
-        """Get a database connection"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable column access by name
-            return conn
-        except sqlite3.Error as e:
-            self.logger.error(f"Database connection error: {e}")
-            raise
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the database manager's writer connection for a with block"""
+        with self.db_manager.get_connection() as conn:
+            yield conn
+    
+    def close(self):
+        """Close the database manager if this user manager opened it"""
+        if self._owns_db:
+            self.db_manager.close()
     
     def init_users_db(self):
         """Initialize the users table and create default users"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                # Table and default users are written in one transaction
+                cursor.execute('BEGIN')
                 
                 # Create users table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT UNIQUE NOT NULL,
-                        password TEXT NOT NULL,
-                        role TEXT NOT NULL,
-                        CHECK (role IN ('doctor', 'receptionist'))
-                    )
-                ''')
-                
-                # Check if default users exist
-                cursor.execute('SELECT COUNT(*) FROM users')
+                cursor.execute(_SQL_CREATE_USERS_TABLE)
+                
+                # Check if default users exist; this keeps warm starts from hashing the defaults
+                cursor.execute(_SQL_COUNT_USERS)
                 user_count = cursor.fetchone()[0]
                 
                 if user_count == 0:
                     # Register default users
-                    self.register_user('doctor', 'doctor123', 'doctor')
-                    self.register_user('receptionist', 'recep123', 'receptionist')
+                    cursor.executemany(_SQL_INSERT_DEFAULT_USER, [
+                        ('doctor', hash_password('doctor123'), 'doctor'),
+                        ('receptionist', hash_password('recep123'), 'receptionist')
+                    ])
                     
                     self.logger.info("Default users created:")
                     self.logger.info("- Doctor: doctor/doctor123")
@@ -76,16 +188,13 @@ class UserManager:
         """
         try:
             # Hash the password
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
+            password_hash = hash_password(password)
             
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # Insert new user
-                cursor.execute('''
-                    INSERT INTO users (username, password, role)
-                    VALUES (?, ?, ?)
-                ''', (username, password_hash, role))
+                cursor.execute(_SQL_INSERT_USER, (username, password_hash, role))
                 
                 conn.commit()
                 self.logger.info(f"User '{username}' registered successfully with role '{role}'")
@@ -107,29 +216,30 @@ class UserManager:
             password: Plain text password to verify
             
         Returns:
-            dict: User data if authentication successful, None otherwise
+            dict: id, username and role if authentication successful, None otherwise
         """
         try:
-            # Hash the provided password
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Check credentials
-                cursor.execute('''
-                    SELECT * FROM users 
-                    WHERE username = ? AND password = ?
-                ''', (username, password_hash))
+                # Salted hashes can't be matched in SQL, so look up by username and verify here
+                cursor.execute(_SQL_GET_CREDENTIALS, (username,))
                 
                 row = cursor.fetchone()
-                if row:
-                    user_data = dict(row)
-                    self.logger.info(f"User '{username}' authenticated successfully")
-                    return user_data
-                else:
+                matches, needs_rehash = verify_password(row['password'], password) if row else (False, False)
+                if not matches:
                     self.logger.warning(f"Authentication failed for user '{username}'")
                     return None
+                
+                if needs_rehash:
+                    # Upgrade legacy or outdated hashes while the plain password is at hand
+                    cursor.execute(_SQL_UPDATE_PASSWORD_BY_ID, (hash_password(password), row['id']))
+                    conn.commit()
+                
+                user_data = {'id': row['id'], 'username': row['username'], 'role': row['role']}
+                
+                self.logger.info(f"User '{username}' authenticated successfully")
+                return user_data
                     
         except sqlite3.Error as e:
             self.logger.error(f"Error authenticating user: {e}")
@@ -138,9 +248,10 @@ class UserManager:
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
         try:
-            with self.get_connection() as conn:
+            with self.db_manager.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(_SQL_GET_USER_BY_USERNAME, (username,))
                 row = cursor.fetchone()
                 return dict(row) if row else None
         except sqlite3.Error as e:
@@ -149,11 +260,15 @@ class UserManager:
     
     def get_all_users(self) -> list:
         """Get all users"""
+        return [dict(row) for row in self.iter_all_users()]
+    
+    def iter_all_users(self) -> Iterator[sqlite3.Row]:
+        """Stream all users as sqlite3.Row objects, which support access by column name"""
         try:
-            with self.get_connection() as conn:
+            with self.db_manager.read_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users ORDER BY username')
-                return [dict(row) for row in cursor.fetchall()]
+                cursor.row_factory = sqlite3.Row
+                yield from cursor.execute(_SQL_GET_ALL_USERS)
         except sqlite3.Error as e:
             self.logger.error(f"Error getting all users: {e}")
             raise
@@ -163,11 +278,7 @@ class UserManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE users 
-                    SET role = ? 
-                    WHERE username = ?
-                ''', (new_role, username))
+                cursor.execute(_SQL_UPDATE_USER_ROLE, (new_role, username))
                 
                 conn.commit()
                 success = cursor.rowcount > 0
@@ -184,7 +295,7 @@ class UserManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('DELETE FROM users WHERE username = ?', (username,))
+                cursor.execute(_SQL_DELETE_USER, (username,))
                 
                 conn.commit()
                 success = cursor.rowcount > 0
@@ -200,15 +311,11 @@ class UserManager:
         """Change user password"""
         try:
             # Hash the new password
-            password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+            password_hash = hash_password(new_password)
             
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE users 
-                    SET password = ? 
-                    WHERE username = ?
-                ''', (password_hash, username))
+                cursor.execute(_SQL_UPDATE_PASSWORD, (password_hash, username))
                 
                 conn.commit()
                 success = cursor.rowcount > 0
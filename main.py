@@ -4,8 +4,6 @@ Dental Clinic Management System
 Main entry point for the application
 """
 
-import tkinter as tk
-from tkinter import messagebox
 import sys
 import os
 
@@ -16,10 +14,10 @@ from database.database_manager import DatabaseManager
 from database.user_manager import UserManager
 from utils.logger import setup_logger
 
-def init_users_db():
+def init_users_db(db_manager: DatabaseManager):
     """Initialize users database with default users"""
     try:
-        user_manager = UserManager("clinic.db")
+        user_manager = UserManager(db_manager)
         user_manager.init_users_db()
         return user_manager
     except Exception as e:
@@ -33,16 +31,18 @@ def main():
         logger = setup_logger()
         logger.info("Starting Dental Clinic Management System")
         
+        # Both managers share one set of connections to the database file
+        db_manager = DatabaseManager("clinic.db")
+        
         # Initialize users database (Task 3)
         logger.info("Initializing users database...")
-        user_manager = init_users_db()
+        user_manager = init_users_db(db_manager)
         
         # Initialize main database
-        db_manager = DatabaseManager("clinic.db")
         db_manager.initialize_database()
         logger.info("Main database initialized successfully")
         
-        # Create and run the login window
+        # Tk is loaded only now, after the database work above, to keep cold start short
         from ui.login_window import LoginWindow
         login = LoginWindow(db_manager)
         
@@ -53,6 +53,7 @@ def main():
         
     except Exception as e:
         logger.error(f"Error starting application: {str(e)}")
+        from tkinter import messagebox
         messagebox.showerror("Error", f"Failed to start application: {str(e)}")
         sys.exit(1)
 
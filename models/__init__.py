@@ -1 +1,9 @@
-# Models package for Dental Clinic Management System 
\ No newline at end of file
+# Models package for Dental Clinic Management System
+
+import sys
+
+# Slotted dataclasses need Python 3.10; older interpreters keep a per-instance __dict__
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Marks a lazily computed model attribute that has not been filled in yet
+UNSET = object() 
\ No newline at end of file
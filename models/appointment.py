@@ -2,11 +2,14 @@
 Appointment model for Dental Clinic Management System
 """
 
+import operator
 from datetime import date, time
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from . import DATACLASS_OPTIONS, UNSET
+
 class AppointmentStatus(Enum):
     """Appointment status enumeration"""
     SCHEDULED = "scheduled"
@@ -16,7 +19,71 @@ class AppointmentStatus(Enum):
     CANCELLED = "cancelled"
     NO_SHOW = "no_show"
 
-@dataclass
+# Stored status text to enum, so parsing never goes through Enum lookup and ValueError
+_STATUS_BY_VALUE = {status.value: status for status in AppointmentStatus}
+
+# Built once at import; the UI looks these up for every row it renders
+_STATUS_COLORS = {
+    AppointmentStatus.SCHEDULED: "#007bff",  # Blue
+    AppointmentStatus.CONFIRMED: "#28a745",  # Green
+    AppointmentStatus.IN_PROGRESS: "#ffc107",  # Yellow
+    AppointmentStatus.COMPLETED: "#6c757d",  # Gray
+    AppointmentStatus.CANCELLED: "#dc3545",  # Red
+    AppointmentStatus.NO_SHOW: "#dc3545"  # Red
+}
+
+_STATUS_NAMES = {
+    AppointmentStatus.SCHEDULED: "Scheduled",
+    AppointmentStatus.CONFIRMED: "Confirmed",
+    AppointmentStatus.IN_PROGRESS: "In Progress",
+    AppointmentStatus.COMPLETED: "Completed",
+    AppointmentStatus.CANCELLED: "Cancelled",
+    AppointmentStatus.NO_SHOW: "No Show"
+}
+
+# Constructor field order, and the from_dict defaults for columns a row may lack
+_APPOINTMENT_FIELDS = (
+    'id', 'patient_id', 'appointment_date', 'appointment_time', 'duration',
+    'treatment_type', 'notes', 'status', 'created_at', 'updated_at', 'patient_name'
+)
+_APPOINTMENT_DEFAULTS = {
+    'id': None, 'patient_id': 0, 'appointment_date': None, 'appointment_time': None,
+    'duration': 60, 'treatment_type': '', 'notes': '', 'status': None,
+    'created_at': None, 'updated_at': None, 'patient_name': ''
+}
+_get_appointment_fields = operator.itemgetter(*_APPOINTMENT_FIELDS)
+
+
+# Stored dates and times were written from isoformat(), so rows parse without a try block
+_parse_date = date.fromisoformat
+_parse_time = time.fromisoformat
+
+
+def _parse_date_lenient(value) -> Optional[date]:
+    """Parse an ISO date string, returning None when it is empty or malformed"""
+    if not value:
+        return None
+    try:
+        return _parse_date(value)
+    except ValueError:
+        return None
+
+
+def _parse_time_lenient(value) -> Optional[time]:
+    """Parse an ISO time string, returning None when it is empty or malformed"""
+    if not value:
+        return None
+    try:
+        return _parse_time(value)
+    except ValueError:
+        return None
+
+
+def _parse_status(value) -> AppointmentStatus:
+    """Convert a stored status string to its enum, defaulting to SCHEDULED"""
+    return _STATUS_BY_VALUE.get(value, AppointmentStatus.SCHEDULED)
+
+@dataclass(**DATACLASS_OPTIONS)
 class Appointment:
     """Appointment data model"""
     
@@ -34,29 +101,37 @@ class Appointment:
     # Additional fields for display purposes
     patient_name: str = ""
     
+    # Cache behind end_time, declared as a field so it gets a slot
+    _end_time: Any = field(default=UNSET, init=False, repr=False, compare=False)
+    
     @property
     def end_time(self) -> Optional[time]:
-        """Calculate appointment end time"""
-        if self.appointment_time:
-            total_minutes = self.appointment_time.hour * 60 + self.appointment_time.minute + self.duration
-            hours = total_minutes // 60
-            minutes = total_minutes % 60
-            return time(hour=hours, minute=minutes)
-        return None
+        """Calculate appointment end time, once per instance"""
+        if self._end_time is UNSET:
+            end_time = None
+            if self.appointment_time:
+                hours, minutes = divmod(self.appointment_time.hour * 60 + self.appointment_time.minute + self.duration, 60)
+                end_time = time(hour=hours, minute=minutes)
+            self._end_time = end_time
+        return self._end_time
     
     @property
     def is_past(self) -> bool:
         """Check if appointment is in the past"""
-        if self.appointment_date:
-            return self.appointment_date < date.today()
-        return False
+        return self.is_past_on(date.today())
     
     @property
     def is_today(self) -> bool:
         """Check if appointment is today"""
-        if self.appointment_date:
-            return self.appointment_date == date.today()
-        return False
+        return self.is_today_on(date.today())
+    
+    def is_past_on(self, today: date) -> bool:
+        """Check if appointment is before the given day; pass one date for a whole list"""
+        return bool(self.appointment_date) and self.appointment_date < today
+    
+    def is_today_on(self, today: date) -> bool:
+        """Check if appointment falls on the given day; pass one date for a whole list"""
+        return bool(self.appointment_date) and self.appointment_date == today
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert appointment to dictionary"""
@@ -76,45 +151,55 @@ class Appointment:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Appointment':
-        """Create appointment from dictionary"""
-        # Convert date string to date object if present
-        appointment_date = None
-        if data.get('appointment_date'):
-            try:
-                appointment_date = date.fromisoformat(data['appointment_date'])
-            except ValueError:
-                pass
-        
-        # Convert time string to time object if present
-        appointment_time = None
-        if data.get('appointment_time'):
-            try:
-                appointment_time = time.fromisoformat(data['appointment_time'])
-            except ValueError:
-                pass
-        
-        # Convert status string to enum
-        status = AppointmentStatus.SCHEDULED
-        if data.get('status'):
-            try:
-                status = AppointmentStatus(data['status'])
-            except ValueError:
-                pass
-        
+        """Create appointment from a stored row or to_dict() output; malformed dates raise ValueError"""
+        appointment_date = data.get('appointment_date')
+        appointment_time = data.get('appointment_time')
         return cls(
             id=data.get('id'),
             patient_id=data.get('patient_id', 0),
-            appointment_date=appointment_date,
-            appointment_time=appointment_time,
+            appointment_date=_parse_date(appointment_date) if appointment_date else None,
+            appointment_time=_parse_time(appointment_time) if appointment_time else None,
             duration=data.get('duration', 60),
             treatment_type=data.get('treatment_type', ''),
             notes=data.get('notes', ''),
-            status=status,
+            status=_parse_status(data.get('status')),
             created_at=data.get('created_at'),
             updated_at=data.get('updated_at'),
             patient_name=data.get('patient_name', '')
         )
     
+    @classmethod
+    def from_user_input(cls, data: Dict[str, Any]) -> 'Appointment':
+        """Create appointment from imported or typed-in data, leaving malformed dates and times unset"""
+        appointment = cls.from_dict({**data, 'appointment_date': None, 'appointment_time': None})
+        appointment.appointment_date = _parse_date_lenient(data.get('appointment_date'))
+        appointment.appointment_time = _parse_time_lenient(data.get('appointment_time'))
+        return appointment
+    
+    @classmethod
+    def from_rows_bulk(cls, rows: List[Dict[str, Any]]) -> List['Appointment']:
+        """
+        Create appointments from many rows sharing the same columns, e.g. one query's results
+        
+        Equivalent to calling from_dict on each row, but reads every field
+        with one itemgetter call and builds each appointment positionally.
+        """
+        if not rows:
+            return []
+        
+        missing = {field: default for field, default in _APPOINTMENT_DEFAULTS.items() if field not in rows[0]}
+        if missing:
+            rows = [{**missing, **row} for row in rows]
+        
+        appointments = [cls(*values) for values in map(_get_appointment_fields, rows)]
+        for appointment in appointments:
+            if appointment.appointment_date:
+                appointment.appointment_date = _parse_date(appointment.appointment_date)
+            if appointment.appointment_time:
+                appointment.appointment_time = _parse_time(appointment.appointment_time)
+            appointment.status = _parse_status(appointment.status)
+        return appointments
+    
     def validate(self) -> list:
         """Validate appointment data and return list of errors"""
         errors = []
@@ -140,24 +225,34 @@ class Appointment:
     
     def get_status_color(self) -> str:
         """Get color for appointment status display"""
-        status_colors = {
-            AppointmentStatus.SCHEDULED: "#007bff",  # Blue
-            AppointmentStatus.CONFIRMED: "#28a745",  # Green
-            AppointmentStatus.IN_PROGRESS: "#ffc107",  # Yellow
-            AppointmentStatus.COMPLETED: "#6c757d",  # Gray
-            AppointmentStatus.CANCELLED: "#dc3545",  # Red
-            AppointmentStatus.NO_SHOW: "#dc3545"  # Red
-        }
-        return status_colors.get(self.status, "#6c757d")
+        return _STATUS_COLORS.get(self.status, "#6c757d")
     
     def get_status_display_name(self) -> str:
         """Get display name for appointment status"""
-        status_names = {
-            AppointmentStatus.SCHEDULED: "Scheduled",
-            AppointmentStatus.CONFIRMED: "Confirmed",
-            AppointmentStatus.IN_PROGRESS: "In Progress",
-            AppointmentStatus.COMPLETED: "Completed",
-            AppointmentStatus.CANCELLED: "Cancelled",
-            AppointmentStatus.NO_SHOW: "No Show"
-        }
-        return status_names.get(self.status, "Unknown") 
\ No newline at end of file
+        return _STATUS_NAMES.get(self.status, "Unknown")
+
+
+def partition_by_today(appointments: Iterable[Appointment], today: Optional[date] = None
+                       ) -> Tuple[List[Appointment], List[Appointment], List[Appointment]]:
+    """
+    Split appointments into past, today and upcoming lists in one pass
+    
+    Args:
+        appointments: Appointments to classify, kept in their given order
+        today: Reference day, defaults to date.today() read once for the whole list
+        
+    Returns:
+        tuple: (past, today, upcoming); appointments without a date count as upcoming
+    """
+    if today is None:
+        today = date.today()
+    past, todays, upcoming = [], [], []
+    for appointment in appointments:
+        appointment_date = appointment.appointment_date
+        if not appointment_date or appointment_date > today:
+            upcoming.append(appointment)
+        elif appointment_date < today:
+            past.append(appointment)
+        else:
+            todays.append(appointment)
+    return past, todays, upcoming
@@ -2,11 +2,45 @@
 Patient model for Dental Clinic Management System
 """
 
+import re
+import operator
 from datetime import date
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, field
 
-@dataclass
+from . import DATACLASS_OPTIONS, UNSET
+
+# Compiled once at import since validation runs for every patient on bulk imports.
+# Basic phone validation - can be customized based on requirements
+_PHONE_RE = re.compile(r'^[\+]?[1-9][\d]{0,15}$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Separators stripped from phone numbers before matching, in a single pass
+_PHONE_SEPARATORS = str.maketrans('', '', ' -()')
+
+# Constructor field order, and the from_dict defaults for columns a row may lack
+_PATIENT_FIELDS = (
+    'id', 'first_name', 'last_name', 'date_of_birth', 'phone', 'email',
+    'address', 'emergency_contact', 'medical_history', 'created_at', 'updated_at'
+)
+_PATIENT_DEFAULTS = {
+    'id': None, 'first_name': '', 'last_name': '', 'date_of_birth': None,
+    'phone': '', 'email': '', 'address': '', 'emergency_contact': '',
+    'medical_history': '', 'created_at': None, 'updated_at': None
+}
+_get_patient_fields = operator.itemgetter(*_PATIENT_FIELDS)
+
+
+def _parse_date(value) -> Optional[date]:
+    """Parse an ISO date string, returning None when it is empty or malformed"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+@dataclass(**DATACLASS_OPTIONS)
 class Patient:
     """Patient data model"""
     
@@ -22,16 +56,27 @@ class Patient:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     
+    # Caches behind full_name and age, declared as fields so they get slots
+    _full_name: Any = field(default=UNSET, init=False, repr=False, compare=False)
+    _age: Any = field(default=UNSET, init=False, repr=False, compare=False)
+    
     @property
     def full_name(self) -> str:
-        """Get the patient's full name"""
-        return f"{self.first_name} {self.last_name}".strip()
+        """Get the patient's full name, built once per instance"""
+        if self._full_name is UNSET:
+            self._full_name = f"{self.first_name} {self.last_name}".strip()
+        return self._full_name
     
     @property
     def age(self) -> Optional[int]:
-        """Calculate patient's age"""
+        """Calculate patient's age, once per instance"""
+        if self._age is UNSET:
+            self._age = self.age_on(date.today())
+        return self._age
+    
+    def age_on(self, today: date) -> Optional[int]:
+        """Calculate patient's age on the given day; pass one date for a whole list"""
         if self.date_of_birth:
-            today = date.today()
             return today.year - self.date_of_birth.year - (
                 (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
             )
@@ -56,19 +101,11 @@ class Patient:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Patient':
         """Create patient from dictionary"""
-        # Convert date string to date object if present
-        date_of_birth = None
-        if data.get('date_of_birth'):
-            try:
-                date_of_birth = date.fromisoformat(data['date_of_birth'])
-            except ValueError:
-                pass
-        
         return cls(
             id=data.get('id'),
             first_name=data.get('first_name', ''),
             last_name=data.get('last_name', ''),
-            date_of_birth=date_of_birth,
+            date_of_birth=_parse_date(data.get('date_of_birth')),
             phone=data.get('phone', ''),
             email=data.get('email', ''),
             address=data.get('address', ''),
@@ -78,6 +115,26 @@ class Patient:
             updated_at=data.get('updated_at')
         )
     
+    @classmethod
+    def from_rows_bulk(cls, rows: List[Dict[str, Any]]) -> List['Patient']:
+        """
+        Create patients from many rows sharing the same columns, e.g. one query's results
+        
+        Equivalent to calling from_dict on each row, but reads every field
+        with one itemgetter call and builds each patient positionally.
+        """
+        if not rows:
+            return []
+        
+        missing = {field: default for field, default in _PATIENT_DEFAULTS.items() if field not in rows[0]}
+        if missing:
+            rows = [{**missing, **row} for row in rows]
+        
+        patients = [cls(*values) for values in map(_get_patient_fields, rows)]
+        for patient in patients:
+            patient.date_of_birth = _parse_date(patient.date_of_birth)
+        return patients
+    
     def validate(self) -> list:
         """Validate patient data and return list of errors"""
         errors = []
@@ -98,13 +155,8 @@ class Patient:
     
     def _is_valid_phone(self, phone: str) -> bool:
         """Check if phone number is valid"""
-        import re
-        # Basic phone validation - can be customized based on requirements
-        phone_pattern = r'^[\+]?[1-9][\d]{0,15}$'
-        return bool(re.match(phone_pattern, phone.replace(' ', '').replace('-', '').replace('(', '').replace(')', '')))
+        return _PHONE_RE.match(phone.translate(_PHONE_SEPARATORS)) is not None
     
     def _is_valid_email(self, email: str) -> bool:
         """Check if email is valid"""
-        import re
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(email_pattern, email)) 
\ No newline at end of file
+        return _EMAIL_RE.match(email) is not None 
\ No newline at end of file
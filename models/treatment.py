@@ -5,7 +5,9 @@ Treatment model for Dental Clinic Management System
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 
-@dataclass
+from . import DATACLASS_OPTIONS
+
+@dataclass(**DATACLASS_OPTIONS)
 class Treatment:
     """Treatment data model"""
     
@@ -4,20 +4,105 @@ Appointment Frame for Dental Clinic Management System
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import date, datetime
+from datetime import date, datetime, time as time_type
 import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from functools import lru_cache
 
 from models.appointment import Appointment, AppointmentStatus
 
+# How often the Tk loop checks for a finished background query, in milliseconds
+RESULT_POLL_MS = 50
+
+# Rows added to the tree at a time; more are appended as the user scrolls near the end
+RENDER_CHUNK = 100
+
+# Rows inserted per idle callback, so Tk can repaint and handle input between batches
+RENDER_BATCH = 50
+
+# Tcl lambda inserting a list of rows into a Treeview, so a whole batch is one Python-to-Tcl call.
+# Rows travel as a Tcl list object, so their values need no quoting.
+# The first field of each row is the appointment id, used as the item id.
+_TCL_INSERT_ROWS = '{tree rows} {foreach row $rows {$tree insert {} end -id [lindex $row 0] -values [lrange $row 1 end]}}'
+
+# Quiet period after the last edit of the date filter before it is applied, in milliseconds
+FILTER_DEBOUNCE_MS = 250
+
+# Patient combo options are reused for this many seconds across frame rebuilds
+PATIENT_CACHE_TTL = 30
+
+# Formatted patient combo options, their patient ids and when they were loaded; shared by every AppointmentFrame
+_PATIENT_CACHE = {'at': 0.0, 'options': None, 'ids': None}
+
+# Number of date filters whose appointment lists are kept in memory
+APPOINTMENT_CACHE_SIZE = 8
+
+# Status combo choices, built from the enum once at import
+_STATUS_VALUES = tuple(status.value for status in AppointmentStatus)
+
+_title = str.title
+
+# Appointment form rows above the notes: (label, widget kind, StringVar attribute, widget attribute, initial value)
+_FORM_FIELDS = (
+    ("Patient", 'combo', 'patient_var', 'patient_combo', ''),
+    ("Date", 'entry', 'date_var_form', None, ''),
+    ("Time", 'entry', 'time_var', None, ''),
+    ("Duration (min)", 'entry', 'duration_var', None, '60'),
+    ("Treatment", 'entry', 'treatment_var', None, ''),
+    ("Status", 'combo', 'status_var', 'status_combo', ''),
+)
+
+
+def _invalidate_dashboard_cache():
+    """Drop the dashboard's cached counts after an appointment is added or changed"""
+    # Imported here because the dashboard module imports this one
+    from .dashboard_frame import DashboardFrame
+    DashboardFrame.invalidate_cache()
+
+
+@lru_cache(maxsize=1024)
+def _format_patient_option(patient_id, first_name, last_name):
+    """Patient combo label, memoized so unchanged patients reuse the same string on reload"""
+    return f"{patient_id} - {first_name} {last_name}"
+
+
 class AppointmentFrame(tk.Frame):
     """Appointment management frame"""
     
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, db_executor: ThreadPoolExecutor = None):
         super().__init__(parent, bg='white')
         self.db_manager = db_manager
+        # Runs queries off the Tk thread; the main window shares one pool across frames
+        self.db_executor = db_executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='dbio')
         self.logger = logging.getLogger(__name__)
         self.selected_appointment = None
         
+        # Patient id for each patient combo entry, by position
+        self._patient_ids = []
+        
+        # Background queries hand (appointments, error) pairs back through this queue
+        self._result_q = queue.Queue()
+        self._fetch_in_flight = False
+        self._reload_pending = False
+        
+        # Every row of the current result, of which the first _rendered are in the tree
+        # and _render_target should be once the scheduled batches have run
+        self._all_rows = []
+        self._row_index_by_id = {}
+        self._shown_filter = None
+        self._rendered = 0
+        self._render_target = 0
+        self._render_job = None
+        
+        # Pending after() job that applies an edited date filter
+        self._filter_job = None
+        
+        # Appointment lists by filter date, least recently used first; cleared whenever we write
+        self._apt_cache = OrderedDict()
+        
         self.setup_ui()
         self.load_appointments()
     
@@ -55,8 +140,9 @@ class AppointmentFrame(tk.Frame):
         self.date_var = tk.StringVar(value=date.today().isoformat())
         date_entry = tk.Entry(filter_frame, textvariable=self.date_var, width=15)
         date_entry.pack(side=tk.LEFT, padx=(5, 10))
+        self.date_var.trace_add('write', self._on_date_changed)
         
-        filter_btn = tk.Button(
+        self.filter_btn = tk.Button(
             filter_frame,
             text="Filter",
             command=self.load_appointments,
@@ -66,7 +152,7 @@ class AppointmentFrame(tk.Frame):
             padx=10,
             pady=2
         )
-        filter_btn.pack(side=tk.LEFT)
+        self.filter_btn.pack(side=tk.LEFT)
         
         # Buttons frame
         buttons_frame = tk.Frame(list_frame, bg='white')
@@ -84,17 +170,17 @@ class AppointmentFrame(tk.Frame):
         )
         add_btn.pack(side=tk.LEFT, padx=(0, 5))
         
-        refresh_btn = tk.Button(
+        self.refresh_btn = tk.Button(
             buttons_frame,
             text="Refresh",
-            command=self.load_appointments,
+            command=self.refresh_appointments,
             bg='#3498db',
             fg='white',
             bd=0,
             padx=15,
             pady=5
         )
-        refresh_btn.pack(side=tk.LEFT)
+        self.refresh_btn.pack(side=tk.LEFT)
         
         # Appointment list
         list_label = tk.Label(list_frame, text="Appointments:", bg='white', font=('Arial', 12, 'bold'))
@@ -119,19 +205,27 @@ class AppointmentFrame(tk.Frame):
         self.appointment_tree.column('Status', width=100)
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.appointment_tree.yview)
-        self.appointment_tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.appointment_tree.yview)
+        self.appointment_tree.configure(yscrollcommand=self.on_tree_scroll)
         
         self.appointment_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 10))
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=(0, 10))
         
         # Bind selection event
         self.appointment_tree.bind('<<TreeviewSelect>>', self.on_appointment_select)
     
     def create_appointment_details_panel(self, parent):
-        """Create the appointment details panel"""
-        details_frame = tk.Frame(parent, bg='white', relief=tk.RAISED, bd=1)
-        details_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        """Create an empty placeholder for the details panel, which is filled in on first use"""
+        self.details_frame = tk.Frame(parent, bg='white', relief=tk.RAISED, bd=1)
+        self.details_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        self._details_built = False
+    
+    def _build_details_panel_once(self):
+        """Build the details form and load its patient options the first time they are needed"""
+        if self._details_built:
+            return
+        self._details_built = True
+        details_frame = self.details_frame
         
         # Title
         details_title = tk.Label(
@@ -154,43 +248,31 @@ class AppointmentFrame(tk.Frame):
     
     def create_form_fields(self, parent):
         """Create form fields for appointment details"""
-        # Patient selection
-        tk.Label(parent, text="Patient:", bg='white').grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.patient_var = tk.StringVar()
-        self.patient_combo = ttk.Combobox(parent, textvariable=self.patient_var, width=30, state='readonly')
-        self.patient_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        # Date
-        tk.Label(parent, text="Date:", bg='white').grid(row=1, column=0, sticky=tk.W, pady=5)
-        self.date_var_form = tk.StringVar()
-        tk.Entry(parent, textvariable=self.date_var_form, width=30).grid(row=1, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        # Time
-        tk.Label(parent, text="Time:", bg='white').grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.time_var = tk.StringVar()
-        tk.Entry(parent, textvariable=self.time_var, width=30).grid(row=2, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        # Duration
-        tk.Label(parent, text="Duration (min):", bg='white').grid(row=3, column=0, sticky=tk.W, pady=5)
-        self.duration_var = tk.StringVar(value="60")
-        tk.Entry(parent, textvariable=self.duration_var, width=30).grid(row=3, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        # Treatment type
-        tk.Label(parent, text="Treatment:", bg='white').grid(row=4, column=0, sticky=tk.W, pady=5)
-        self.treatment_var = tk.StringVar()
-        tk.Entry(parent, textvariable=self.treatment_var, width=30).grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
-        
-        # Status
-        tk.Label(parent, text="Status:", bg='white').grid(row=5, column=0, sticky=tk.W, pady=5)
-        self.status_var = tk.StringVar()
-        status_combo = ttk.Combobox(parent, textvariable=self.status_var, width=30, state='readonly')
-        status_combo['values'] = [status.value for status in AppointmentStatus]
-        status_combo.grid(row=5, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        grid_options = {'column': 1, 'sticky': tk.W, 'pady': 5, 'padx': (10, 0)}
+        for row, (label, kind, var_name, widget_name, initial) in enumerate(_FORM_FIELDS):
+            tk.Label(parent, text=f"{label}:", bg='white').grid(row=row, column=0, sticky=tk.W, pady=5)
+            var = tk.StringVar(value=initial)
+            setattr(self, var_name, var)
+            if kind == 'combo':
+                widget = ttk.Combobox(parent, textvariable=var, width=30, state='readonly')
+            else:
+                widget = tk.Entry(parent, textvariable=var, width=30)
+            widget.grid(row=row, **grid_options)
+            if widget_name:
+                setattr(self, widget_name, widget)
+        
+        self.status_combo['values'] = _STATUS_VALUES
         
         # Notes
-        tk.Label(parent, text="Notes:", bg='white').grid(row=6, column=0, sticky=tk.W, pady=5)
+        notes_row = len(_FORM_FIELDS)
+        tk.Label(parent, text="Notes:", bg='white').grid(row=notes_row, column=0, sticky=tk.W, pady=5)
         self.notes_text = tk.Text(parent, height=4, width=30)
-        self.notes_text.grid(row=6, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        self.notes_text.grid(row=notes_row, **grid_options)
+        
+        # Notes are copied out of the Text widget only after they change
+        self._notes_cache = ''
+        self._notes_dirty = False
+        self.notes_text.bind('<<Modified>>', self._on_notes_modified)
         
         # Load patients for combo box
         self.load_patients_combo()
@@ -253,54 +335,190 @@ class AppointmentFrame(tk.Frame):
         self.delete_btn.config(state=tk.DISABLED)
     
     def load_patients_combo(self):
-        """Load patients into combo box"""
+        """Load patients into combo box, reusing recently loaded options"""
         try:
-            patients = self.db_manager.get_patients()
-            patient_options = [f"{p['id']} - {p['first_name']} {p['last_name']}" for p in patients]
-            self.patient_combo['values'] = patient_options
+            now = time.monotonic()
+            if _PATIENT_CACHE['options'] is None or now - _PATIENT_CACHE['at'] >= PATIENT_CACHE_TTL:
+                patients = self.db_manager.list_patients_summary()
+                _PATIENT_CACHE['options'] = [_format_patient_option(p['id'], p['first_name'], p['last_name'])
+                                             for p in patients]
+                _PATIENT_CACHE['ids'] = [p['id'] for p in patients]
+                _PATIENT_CACHE['at'] = now
+            self.patient_combo['values'] = _PATIENT_CACHE['options']
+            self._patient_ids = _PATIENT_CACHE['ids']
         except Exception as e:
             self.logger.error(f"Error loading patients for combo: {e}")
     
+    @staticmethod
+    def invalidate_patient_cache():
+        """Drop the cached patient options; call after adding, changing or removing a patient"""
+        _PATIENT_CACHE['options'] = None
+    
     def on_appointment_select(self, event):
         """Handle appointment selection"""
         selection = self.appointment_tree.selection()
         if selection:
+            self._build_details_panel_once()
+            # Item ids are appointment ids
+            self.selected_appointment = {'id': int(selection[0])}
+            self.update_btn.config(state=tk.NORMAL)
+            self.delete_btn.config(state=tk.NORMAL)
             # Load appointment details (implementation needed)
-            pass
+    
+    def _on_date_changed(self, *args):
+        """Reload once typing in the date filter pauses; Filter still applies it at once"""
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+            self._filter_job = None
+        
+        # Skip half-typed dates, which could not match anything anyway
+        filter_date = self.date_var.get().strip()
+        if filter_date:
+            try:
+                date.fromisoformat(filter_date)
+            except ValueError:
+                return
+        
+        self._filter_job = self.after(FILTER_DEBOUNCE_MS, self._apply_date_filter)
+    
+    def _apply_date_filter(self):
+        """Run the debounced reload scheduled by _on_date_changed"""
+        self._filter_job = None
+        self.load_appointments()
     
     def load_appointments(self):
-        """Load appointments from database"""
+        """Load appointments from database on a worker thread, keeping the window responsive"""
+        if self._fetch_in_flight:
+            # Run once more when the current query returns, so the list reflects the latest change
+            self._reload_pending = True
+            return
+        
+        # Tk variables may only be read from the main thread
+        filter_date = self.date_var.get().strip()
+        if filter_date:
+            # Canonical YYYY-MM-DD, so equivalent spellings share a cache entry and bad input never hits the DB
+            try:
+                filter_date = date.fromisoformat(filter_date).isoformat()
+            except ValueError:
+                messagebox.showwarning("Warning", "Please enter the date as YYYY-MM-DD")
+                return
+        
+        self._fetch_in_flight = True
+        self._reload_pending = False
+        self.filter_btn.config(state=tk.DISABLED)
+        self.refresh_btn.config(state=tk.DISABLED)
+        
+        rows = self._apt_cache.get(filter_date)
+        if rows is not None:
+            self._apt_cache.move_to_end(filter_date)
+            self._result_q.put((filter_date, rows, None))
+            self._poll_results()
+            return
+        
+        self.db_executor.submit(self._fetch_appointments, filter_date)
+        self.after(RESULT_POLL_MS, self._poll_results)
+    
+    def refresh_appointments(self):
+        """Reload appointments from the database, bypassing the cache"""
+        self._apt_cache.clear()
+        self.load_appointments()
+    
+    def _fetch_appointments(self, filter_date):
+        """Query appointments on a db_executor worker and queue the result for _poll_results"""
         try:
-            # Clear existing items
-            for item in self.appointment_tree.get_children():
-                self.appointment_tree.delete(item)
+            appointments = self.db_manager.get_appointment_list_rows(date=filter_date if filter_date else None)
+            # Rows arrive in column order; only the status needs formatting for display
+            rows = [(apt_id, time_str, patient, treatment, _title(status))
+                    for apt_id, time_str, patient, treatment, status in appointments]
+            self._result_q.put((filter_date, rows, None))
+        except Exception as e:
+            self._result_q.put((filter_date, None, e))
+    
+    def _poll_results(self):
+        """Fill the tree once the background query has finished, otherwise check again shortly"""
+        if not self.winfo_exists():
+            return
+        
+        try:
+            filter_date, rows, error = self._result_q.get_nowait()
+        except queue.Empty:
+            self.after(RESULT_POLL_MS, self._poll_results)
+            return
+        
+        self._fetch_in_flight = False
+        self.filter_btn.config(state=tk.NORMAL)
+        self.refresh_btn.config(state=tk.NORMAL)
+        
+        if error:
+            self.logger.error(f"Error loading appointments: {error}")
+            messagebox.showerror("Error", f"Failed to load appointments: {str(error)}")
+        else:
+            # A write made while this query ran leaves a reload pending; don't cache the older rows
+            if not self._reload_pending:
+                self._apt_cache[filter_date] = rows
+                if len(self._apt_cache) > APPOINTMENT_CACHE_SIZE:
+                    self._apt_cache.popitem(last=False)
+            self._shown_filter = filter_date
+            self._populate_tree(rows)
+        
+        if self._reload_pending:
+            self.load_appointments()
+    
+    def _populate_tree(self, rows):
+        """Replace the tree contents with the given (id, *values) rows, rendering only the first chunk"""
+        try:
+            # Shared with the cache entry, so patching a row keeps the cache current
+            self._all_rows = rows
+            self._row_index_by_id = {row[0]: index for index, row in enumerate(rows)}
+            self._rendered = 0
+            self._render_target = RENDER_CHUNK
+            if self._render_job:
+                self.after_cancel(self._render_job)
+                self._render_job = None
             
-            # Get filter date
-            filter_date = self.date_var.get().strip()
+            # Clear existing items in one call
+            self.appointment_tree.delete(*self.appointment_tree.get_children())
             
-            # Get appointments from database
-            appointments = self.db_manager.get_appointments(date=filter_date if filter_date else None)
-            
-            # Add appointments to treeview
-            for apt in appointments:
-                time_str = apt['appointment_time'] if apt['appointment_time'] else "N/A"
-                patient_name = apt.get('patient_name', f"Patient {apt['patient_id']}")
-                treatment = apt.get('treatment_type', 'General Checkup')
-                status = apt.get('status', 'scheduled').title()
-                
-                self.appointment_tree.insert('', tk.END, values=(
-                    time_str,
-                    patient_name,
-                    treatment,
-                    status
-                ))
+            self._render_batch()
             
         except Exception as e:
-            self.logger.error(f"Error loading appointments: {e}")
-            messagebox.showerror("Error", f"Failed to load appointments: {str(e)}")
+            self.logger.error(f"Error displaying appointments: {e}")
+            messagebox.showerror("Error", f"Failed to display appointments: {str(e)}")
+    
+    def _render_batch(self):
+        """Append up to RENDER_BATCH more rows, then continue from an idle callback until the target is met"""
+        self._render_job = None
+        end = min(self._render_target, self._rendered + RENDER_BATCH, len(self._all_rows))
+        rows = self._all_rows[self._rendered:end]
+        if not rows:
+            return
+        
+        tree = self.appointment_tree
+        # Hide the columns while inserting so ttk lays the table out once, not per row
+        tree.configure(displaycolumns=())
+        try:
+            tree.tk.call('apply', _TCL_INSERT_ROWS, tree, rows)
+        finally:
+            tree.configure(displaycolumns='#all')
+        self._rendered = end
+        
+        if self._rendered < min(self._render_target, len(self._all_rows)):
+            self._render_job = self.after_idle(self._render_batch)
+    
+    def on_tree_scroll(self, first, last):
+        """Update the scrollbar and render more rows once the view nears the end of the tree"""
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and not self._render_job and self._rendered < len(self._all_rows):
+            self._render_target = self._rendered + RENDER_CHUNK
+            self._render_job = self.after_idle(self._render_batch)
     
     def add_appointment(self):
         """Add a new appointment"""
+        if not self._details_built:
+            # First click only opens the form to fill in
+            self._build_details_panel_once()
+            return
+        
         try:
             # Validate form data
             appointment_data = self.get_form_data()
@@ -312,12 +530,13 @@ class AppointmentFrame(tk.Frame):
             
             # Add appointment to database
             appointment_id = self.db_manager.add_appointment(appointment_data)
+            _invalidate_dashboard_cache()
             
             messagebox.showinfo("Success", f"Appointment added successfully with ID: {appointment_id}")
             
             # Clear form and reload appointments
             self.clear_form()
-            self.load_appointments()
+            self.refresh_appointments()
             
         except Exception as e:
             self.logger.error(f"Error adding appointment: {e}")
@@ -342,8 +561,9 @@ class AppointmentFrame(tk.Frame):
             success = self.db_manager.update_appointment_status(self.selected_appointment['id'], appointment_data['status'])
             
             if success:
+                _invalidate_dashboard_cache()
+                self._patch_row_status(self.selected_appointment['id'], appointment_data['status'])
                 messagebox.showinfo("Success", "Appointment updated successfully")
-                self.load_appointments()
             else:
                 messagebox.showerror("Error", "Failed to update appointment")
             
@@ -351,6 +571,21 @@ class AppointmentFrame(tk.Frame):
             self.logger.error(f"Error updating appointment: {e}")
             messagebox.showerror("Error", f"Failed to update appointment: {str(e)}")
     
+    def _patch_row_status(self, appointment_id, status):
+        """Show a new status for one appointment without reloading the list"""
+        index = self._row_index_by_id.get(appointment_id)
+        if index is None:
+            return
+        
+        row = self._all_rows[index][:-1] + (_title(status),)
+        self._all_rows[index] = row
+        if index < self._rendered:
+            self.appointment_tree.item(str(appointment_id), values=row[1:])
+        
+        # Only the shown list was patched; other cached dates may hold the old row
+        for key in [key for key in self._apt_cache if key != self._shown_filter]:
+            del self._apt_cache[key]
+    
     def delete_appointment(self):
         """Delete selected appointment"""
         if not self.selected_appointment:
@@ -365,7 +600,7 @@ class AppointmentFrame(tk.Frame):
                 # Delete appointment from database (implementation needed in db_manager)
                 messagebox.showinfo("Success", "Appointment deleted successfully")
                 self.clear_form()
-                self.load_appointments()
+                self.refresh_appointments()
                 
             except Exception as e:
                 self.logger.error(f"Error deleting appointment: {e}")
@@ -390,16 +625,29 @@ class AppointmentFrame(tk.Frame):
         self.update_btn.config(state=tk.DISABLED)
         self.delete_btn.config(state=tk.DISABLED)
     
+    def _on_notes_modified(self, event):
+        """Mark the notes for re-reading and re-arm Tk's modified flag for the next edit"""
+        self._notes_dirty = True
+        self.notes_text.edit_modified(False)
+    
+    def _get_notes(self):
+        """Return the notes text, reading the widget only if it changed since the last read"""
+        if self._notes_dirty:
+            self._notes_cache = self.notes_text.get('1.0', 'end-1c').strip()
+            self._notes_dirty = False
+        return self._notes_cache
+    
     def get_form_data(self):
         """Get data from form fields"""
+        patient_index = self.patient_combo.current()
         return {
-            'patient_id': self.patient_var.get().split(' - ')[0] if self.patient_var.get() else None,
+            'patient_id': self._patient_ids[patient_index] if patient_index >= 0 else None,
             'appointment_date': self.date_var_form.get().strip(),
             'appointment_time': self.time_var.get().strip(),
             'duration': int(self.duration_var.get()) if self.duration_var.get() else 60,
             'treatment_type': self.treatment_var.get().strip(),
             'status': self.status_var.get().strip(),
-            'notes': self.notes_text.get(1.0, tk.END).strip()
+            'notes': self._get_notes()
         }
     
     def validate_appointment_data(self, data):
@@ -411,9 +659,19 @@ class AppointmentFrame(tk.Frame):
         
         if not data['appointment_date']:
             errors.append("Date is required")
+        else:
+            try:
+                date.fromisoformat(data['appointment_date'])
+            except ValueError:
+                errors.append("Date must be in YYYY-MM-DD format")
         
         if not data['appointment_time']:
             errors.append("Time is required")
+        else:
+            try:
+                time_type.fromisoformat(data['appointment_time'])
+            except ValueError:
+                errors.append("Time must be in HH:MM format")
         
         # Add more validation as needed
         
@@ -3,9 +3,84 @@ Dashboard Frame for Dental Clinic Management System
 """
 
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, messagebox
 from datetime import date, datetime
 import logging
+import queue
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from .appointment_frame import AppointmentFrame, RESULT_POLL_MS, _TCL_INSERT_ROWS
+
+# Sets the text of every label in a flat list of label, text pairs in one Tcl call
+_TCL_SET_LABEL_TEXTS = '{pairs} {foreach {label text} $pairs {$label configure -text $text}}'
+
+# A loaded dashboard is reused for this many seconds when the frame is reopened
+DASHBOARD_CACHE_TTL = 30
+
+# Last dashboard payload, the day and time it was loaded, and a counter bumped by every
+# invalidation so a query that overlapped a write is not cached; shared by every DashboardFrame
+_DASH_CACHE = {'day': None, 'at': 0.0, 'payload': None, 'generation': 0}
+
+SUBTITLES = {
+    'admin': 'System Administrator - Full Access',
+    'receptionist': 'Patient Management & Scheduling',
+    'doctor': 'Patient Care & Treatment',
+    'dentist': 'Patient Care & Treatment',
+    'hygienist': 'Dental Hygiene Services',
+    'staff': 'General Staff Access'
+}
+
+# Statistics cards as (title, initial value, color); roles not listed get the admin cards
+_CLINICAL_STATS = (
+    ("Today's Appointments", "0", "#e74c3c"),
+    ("Patients Seen Today", "0", "#27ae60"),
+    ("Pending Treatments", "0", "#f39c12"),
+    ("Treatment Records", "0", "#3498db")
+)
+STATS_BY_ROLE = {
+    'receptionist': (
+        ("Total Patients", "0", "#3498db"),
+        ("Today's Appointments", "0", "#e74c3c"),
+        ("Pending Appointments", "0", "#f39c12"),
+        ("Outstanding Invoices", "0", "#9b59b6")
+    ),
+    'dentist': _CLINICAL_STATS,
+    'doctor': _CLINICAL_STATS,
+    'admin': (
+        ("Total Patients", "0", "#3498db"),
+        ("Today's Appointments", "0", "#e74c3c"),
+        ("Pending Appointments", "0", "#f39c12"),
+        ("Total Treatments", "0", "#27ae60")
+    )
+}
+
+# Quick action buttons as (label, DashboardFrame method name, color); same fallback as above
+_CLINICAL_ACTIONS = (
+    ("View Today's Appointments", 'view_todays_appointments', "#e74c3c"),
+    ("Manage Medical History", 'manage_medical_history', "#3498db"),
+    ("Add Treatment Records", 'add_treatment_records', "#27ae60"),
+    ("Patient Search", 'patient_search', "#f39c12")
+)
+ACTIONS_BY_ROLE = {
+    'receptionist': (
+        ("Quick Add Patient", 'quick_add_patient', "#27ae60"),
+        ("Manage Patients", 'manage_patients', "#3498db"),
+        ("Schedule Appointments", 'schedule_appointments', "#e74c3c"),
+        ("Generate Invoices", 'generate_invoices', "#9b59b6"),
+        ("View Calendar", 'view_calendar', "#f39c12")
+    ),
+    'dentist': _CLINICAL_ACTIONS,
+    'doctor': _CLINICAL_ACTIONS,
+    'admin': (
+        ("Manage Patients", 'manage_patients', "#3498db"),
+        ("Schedule Appointments", 'schedule_appointments', "#e74c3c"),
+        ("View Treatments", 'view_treatments', "#27ae60"),
+        ("Generate Reports", 'generate_reports', "#9b59b6")
+    )
+}
 
 class DashboardFrame(tk.Frame):
     """Dashboard frame showing role-specific overview information"""
@@ -17,6 +92,26 @@ class DashboardFrame(tk.Frame):
         self.main_window = main_window  # Reference to main window for navigation
         self.logger = logging.getLogger(__name__)
         
+        # Dashboard queries run on the main window's shared pool; results come back through the queue
+        self.db_executor = (
+            main_window.db_executor if main_window
+            else ThreadPoolExecutor(max_workers=1, thread_name_prefix='dbio')
+        )
+        self._result_q = queue.Queue()
+        
+        # Dialogs are built on first open, then hidden on close and reused
+        self._invoice_win = None
+        self._quick_patient_win = None
+        
+        # Fonts are created once and shared by every label and button on the dashboard
+        self._f_welcome = tkfont.Font(root=self, family='Arial', size=20, weight='bold')
+        self._f_subtitle = tkfont.Font(root=self, family='Arial', size=12)
+        self._f_value = tkfont.Font(root=self, family='Arial', size=24, weight='bold')
+        self._f_card = tkfont.Font(root=self, family='Arial', size=10)
+        self._f_section = tkfont.Font(root=self, family='Arial', size=14, weight='bold')
+        self._f_button = tkfont.Font(root=self, family='Arial', size=11, weight='bold')
+        self._f_dialog = tkfont.Font(root=self, family='Arial', size=16, weight='bold')
+        
         self.setup_ui()
         self.load_dashboard_data()
     
@@ -29,7 +124,7 @@ class DashboardFrame(tk.Frame):
         welcome_label = tk.Label(
             self,
             text=welcome_text,
-            font=('Arial', 20, 'bold'),
+            font=self._f_welcome,
             fg='#2c3e50',
             bg='white'
         )
@@ -40,7 +135,7 @@ class DashboardFrame(tk.Frame):
         subtitle_label = tk.Label(
             self,
             text=subtitle_text,
-            font=('Arial', 12),
+            font=self._f_subtitle,
             fg='#7f8c8d',
             bg='white'
         )
@@ -56,60 +151,37 @@ class DashboardFrame(tk.Frame):
         # Create today's appointments section (for all roles)
         self.create_todays_appointments(content_frame)
         
-        # Create role-specific quick actions
-        self.create_role_quick_actions(content_frame, role)
+        # Quick actions are filled in after the first paint; the empty frame holds their place
+        actions_frame = tk.Frame(content_frame, bg='white')
+        actions_frame.pack(fill=tk.X, pady=(20, 0))
+        self.after_idle(self.create_role_quick_actions, actions_frame, role)
     
     def get_role_subtitle(self, role):
         """Get role-specific subtitle"""
-        subtitles = {
-            'admin': 'System Administrator - Full Access',
-            'receptionist': 'Patient Management & Scheduling',
-            'doctor': 'Patient Care & Treatment',
-            'dentist': 'Patient Care & Treatment',
-            'hygienist': 'Dental Hygiene Services',
-            'staff': 'General Staff Access'
-        }
-        return subtitles.get(role, 'General Access')
+        return SUBTITLES.get(role, 'General Access')
     
     def create_role_statistics_cards(self, parent, role):
         """Create role-specific statistics cards"""
         stats_frame = tk.Frame(parent, bg='white')
         stats_frame.pack(fill=tk.X, pady=(0, 30))
         
-        # Statistics cards
+        # Statistics cards; _stats_text holds the text each value label currently shows
         self.stats_cards = {}
+        self._stats_text = {}
+        
+        stats_data = STATS_BY_ROLE.get(role, STATS_BY_ROLE['admin'])
         
-        if role == 'receptionist':
-            stats_data = [
-                ("Total Patients", "0", "#3498db"),
-                ("Today's Appointments", "0", "#e74c3c"),
-                ("Pending Appointments", "0", "#f39c12"),
-                ("Outstanding Invoices", "0", "#9b59b6")
-            ]
-        elif role in ['dentist', 'doctor']:
-            stats_data = [
-                ("Today's Appointments", "0", "#e74c3c"),
-                ("Patients Seen Today", "0", "#27ae60"),
-                ("Pending Treatments", "0", "#f39c12"),
-                ("Treatment Records", "0", "#3498db")
-            ]
-        else:  # admin or other roles
-            stats_data = [
-                ("Total Patients", "0", "#3498db"),
-                ("Today's Appointments", "0", "#e74c3c"),
-                ("Pending Appointments", "0", "#f39c12"),
-                ("Total Treatments", "0", "#27ae60")
-            ]
-        
-        for i, (title, value, color) in enumerate(stats_data):
+        # Cards sit in a grid of equal-width columns that share any extra width
+        for column, (title, value, color) in enumerate(stats_data):
+            stats_frame.grid_columnconfigure(column, weight=1, uniform='stat')
             card_frame = tk.Frame(stats_frame, bg=color, relief=tk.RAISED, bd=2)
-            card_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
+            card_frame.grid(row=0, column=column, sticky=tk.NSEW, padx=5)
             
             # Value label
             value_label = tk.Label(
                 card_frame,
                 text=value,
-                font=('Arial', 24, 'bold'),
+                font=self._f_value,
                 fg='white',
                 bg=color
             )
@@ -119,13 +191,14 @@ class DashboardFrame(tk.Frame):
             title_label = tk.Label(
                 card_frame,
                 text=title,
-                font=('Arial', 10),
+                font=self._f_card,
                 fg='white',
                 bg=color
             )
             title_label.pack(pady=(0, 15))
             
             self.stats_cards[title] = value_label
+            self._stats_text[title] = value
     
     def create_todays_appointments(self, parent):
         """Create today's appointments section"""
@@ -136,12 +209,13 @@ class DashboardFrame(tk.Frame):
         section_title = tk.Label(
             appointments_frame,
             text="Today's Appointments",
-            font=('Arial', 14, 'bold'),
+            font=self._f_section,
             bg='white'
         )
         section_title.pack(anchor=tk.W, pady=(0, 10))
         
-        # Appointments list
+        # Appointments list; _displayed_appts maps appointment id to the values shown
+        self._displayed_appts = {}
         self.appointments_tree = ttk.Treeview(
             appointments_frame,
             columns=('Time', 'Patient', 'Treatment', 'Status'),
@@ -155,10 +229,11 @@ class DashboardFrame(tk.Frame):
         self.appointments_tree.heading('Treatment', text='Treatment')
         self.appointments_tree.heading('Status', text='Status')
         
-        self.appointments_tree.column('Time', width=100)
+        # Time and status have short, fixed-size values; spare width goes to the text columns
+        self.appointments_tree.column('Time', width=100, stretch=False)
         self.appointments_tree.column('Patient', width=200)
         self.appointments_tree.column('Treatment', width=150)
-        self.appointments_tree.column('Status', width=100)
+        self.appointments_tree.column('Status', width=100, stretch=False)
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(appointments_frame, orient=tk.VERTICAL, command=self.appointments_tree.yview)
@@ -167,51 +242,27 @@ class DashboardFrame(tk.Frame):
         self.appointments_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
-    def create_role_quick_actions(self, parent, role):
-        """Create role-specific quick actions"""
-        actions_frame = tk.Frame(parent, bg='white')
-        actions_frame.pack(fill=tk.X, pady=(20, 0))
-        
+    def create_role_quick_actions(self, actions_frame, role):
+        """Create role-specific quick actions inside the given frame"""
         # Section title
         section_title = tk.Label(
             actions_frame,
             text="Quick Actions",
-            font=('Arial', 14, 'bold'),
+            font=self._f_section,
             bg='white'
         )
         section_title.pack(anchor=tk.W, pady=(0, 15))
         
         # Role-specific actions
-        if role == 'receptionist':
-            actions = [
-                ("Quick Add Patient", self.quick_add_patient, "#27ae60"),
-                ("Manage Patients", self.manage_patients, "#3498db"),
-                ("Schedule Appointments", self.schedule_appointments, "#e74c3c"),
-                ("Generate Invoices", self.generate_invoices, "#9b59b6"),
-                ("View Calendar", self.view_calendar, "#f39c12")
-            ]
-        elif role in ['dentist', 'doctor']:
-            actions = [
-                ("View Today's Appointments", self.view_todays_appointments, "#e74c3c"),
-                ("Manage Medical History", self.manage_medical_history, "#3498db"),
-                ("Add Treatment Records", self.add_treatment_records, "#27ae60"),
-                ("Patient Search", self.patient_search, "#f39c12")
-            ]
-        else:  # admin or other roles
-            actions = [
-                ("Manage Patients", self.manage_patients, "#3498db"),
-                ("Schedule Appointments", self.schedule_appointments, "#e74c3c"),
-                ("View Treatments", self.view_treatments, "#27ae60"),
-                ("Generate Reports", self.generate_reports, "#9b59b6")
-            ]
+        actions = ACTIONS_BY_ROLE.get(role, ACTIONS_BY_ROLE['admin'])
         
         # Create action buttons
-        for i, (text, command, color) in enumerate(actions):
+        for text, method_name, color in actions:
             btn = tk.Button(
                 actions_frame,
                 text=text,
-                command=command,
-                font=('Arial', 11, 'bold'),
+                command=getattr(self, method_name),
+                font=self._f_button,
                 bg=color,
                 fg='white',
                 bd=0,
@@ -222,108 +273,170 @@ class DashboardFrame(tk.Frame):
             )
             btn.pack(side=tk.LEFT, padx=5, pady=5)
             
-            # Bind hover events
-            btn.bind('<Enter>', lambda e, b=btn, c=color: self.on_button_hover(b, True, c))
-            btn.bind('<Leave>', lambda e, b=btn, c=color: self.on_button_hover(b, False, c))
+            # Bind hover events; both colors are stored on the button so the handlers only configure
+            btn._orig_bg = color
+            btn._hover_bg = self.darken_color(color)
+            btn.bind('<Enter>', self._on_enter)
+            btn.bind('<Leave>', self._on_leave)
     
-    def on_button_hover(self, button: tk.Button, entering: bool, original_color: str):
-        """Handle button hover events"""
-        if entering:
-            # Darken the color slightly
-            button.configure(bg=self.darken_color(original_color))
-        else:
-            button.configure(bg=original_color)
+    def _on_enter(self, event):
+        """Highlight the quick-action button under the pointer"""
+        event.widget.configure(bg=event.widget._hover_bg)
     
-    def darken_color(self, color: str) -> str:
-        """Darken a hex color for hover effect"""
-        # Simple darkening - in a real app you'd use a proper color library
-        return color  # For now, return same color
+    def _on_leave(self, event):
+        """Restore the quick-action button's color"""
+        event.widget.configure(bg=event.widget._orig_bg)
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def darken_color(color: str) -> str:
+        """Darken a #rrggbb color by 1/8 for hover effect; other color names are returned as is"""
+        if len(color) != 7 or not color.startswith('#'):
+            return color
+        packed = int(color[1:], 16)
+        # Masking the low three bits of each channel keeps the shifted eighths from spilling
+        # into the next channel, so all three are scaled by 7/8 in one subtraction
+        return f"#{packed - ((packed & 0xF8F8F8) >> 3):06x}"
     
     def load_dashboard_data(self):
-        """Load dashboard data from database"""
+        """Load dashboard data on a worker thread; the widgets are filled in when it returns"""
+        today = date.today().isoformat()
+        if (_DASH_CACHE['payload'] is not None and _DASH_CACHE['day'] == today
+                and time.monotonic() - _DASH_CACHE['at'] < DASHBOARD_CACHE_TTL):
+            self._apply_dashboard_data(_DASH_CACHE['payload'])
+            return
+        
+        self.db_executor.submit(self._fetch_dashboard_data, today, _DASH_CACHE['generation'])
+        self.after(RESULT_POLL_MS, self._poll_dashboard_data)
+    
+    @staticmethod
+    def invalidate_cache():
+        """Drop the cached dashboard; call after adding or changing patients or appointments"""
+        _DASH_CACHE['payload'] = None
+        _DASH_CACHE['generation'] += 1
+    
+    def _fetch_dashboard_data(self, today, generation):
+        """Run the dashboard queries off the Tk thread and queue the results"""
         try:
-            # Load statistics
-            self.load_statistics()
-            
-            # Load today's appointments
-            self.load_todays_appointments()
-            
+            payload = {
+                'counts': self.db_manager.get_dashboard_counts(),
+                # Today's appointments feed both the statistics card and the list; the
+                # display tuples come straight from the cursor, with no dict per row
+                'today_appointments': self.db_manager.get_appointment_list_rows(date=today)
+            }
+            self._result_q.put(((today, generation, payload), None))
         except Exception as e:
-            self.logger.error(f"Error loading dashboard data: {e}")
+            self._result_q.put((None, e))
     
-    def load_statistics(self):
-        """Load and display statistics"""
+    def _poll_dashboard_data(self):
+        """Apply the dashboard data once the worker has finished, otherwise check again shortly"""
+        if not self.winfo_exists():
+            return
+        
         try:
-            role = self.current_user.get('role', 'staff') if self.current_user else 'staff'
-            
-            # Get total patients
-            patients = self.db_manager.get_patients()
-            if "Total Patients" in self.stats_cards:
-                self.stats_cards["Total Patients"].configure(text=str(len(patients)))
-            
-            # Get today's appointments
-            today = date.today().isoformat()
-            today_appointments = self.db_manager.get_appointments(date=today)
-            if "Today's Appointments" in self.stats_cards:
-                self.stats_cards["Today's Appointments"].configure(text=str(len(today_appointments)))
-            
-            # Get pending appointments (scheduled status)
-            all_appointments = self.db_manager.get_appointments()
-            pending_count = sum(1 for apt in all_appointments if apt['status'] == 'scheduled')
-            if "Pending Appointments" in self.stats_cards:
-                self.stats_cards["Pending Appointments"].configure(text=str(pending_count))
-            
-            # Get total treatments
-            treatments = self.db_manager.get_treatments()
-            if "Total Treatments" in self.stats_cards:
-                self.stats_cards["Total Treatments"].configure(text=str(len(treatments)))
-            
-            # Role-specific statistics
-            if role == 'receptionist':
-                # Outstanding invoices (placeholder)
-                if "Outstanding Invoices" in self.stats_cards:
-                    self.stats_cards["Outstanding Invoices"].configure(text="0")
-            
-            elif role == 'dentist':
-                # Patients seen today (placeholder)
-                if "Patients Seen Today" in self.stats_cards:
-                    self.stats_cards["Patients Seen Today"].configure(text="0")
-                
-                # Pending treatments (placeholder)
-                if "Pending Treatments" in self.stats_cards:
-                    self.stats_cards["Pending Treatments"].configure(text="0")
-                
-                # Treatment records (placeholder)
-                if "Treatment Records" in self.stats_cards:
-                    self.stats_cards["Treatment Records"].configure(text="0")
+            result, error = self._result_q.get_nowait()
+        except queue.Empty:
+            self.after(RESULT_POLL_MS, self._poll_dashboard_data)
+            return
+        
+        if error:
+            self.logger.error(f"Error loading dashboard data: {error}")
+            return
+        
+        today, generation, payload = result
+        if generation == _DASH_CACHE['generation']:
+            _DASH_CACHE.update(day=today, at=time.monotonic(), payload=payload)
+        self._apply_dashboard_data(payload)
+    
+    def _apply_dashboard_data(self, payload):
+        """Update the statistics cards and today's list; runs on the Tk thread"""
+        # Load statistics
+        self.load_statistics(payload['counts'], payload['today_appointments'])
+        
+        # Load today's appointments
+        self.load_todays_appointments(payload['today_appointments'])
+    
+    def load_statistics(self, counts, today_appointments):
+        """Display statistics"""
+        try:
+            # Cards missing from this role's set are skipped; the placeholder cards
+            # (invoices, patients seen, treatments) keep the "0" they were built with
+            self._update_stats({
+                "Total Patients": counts['total_patients'],
+                "Today's Appointments": len(today_appointments),
+                "Pending Appointments": counts['pending_appointments'],
+                "Total Treatments": counts['total_treatments']
+            })
             
         except Exception as e:
             self.logger.error(f"Error loading statistics: {e}")
     
-    def load_todays_appointments(self):
-        """Load and display today's appointments"""
+    def _update_stats(self, values):
+        """
+        Write new values into the existing statistics cards
+        
+        Cards are created once by create_role_statistics_cards; reloads only
+        reconfigure their value labels, all in one Tcl call, and skip those
+        whose text is unchanged.
+        
+        Args:
+            values: Card title mapped to the value to show
+        """
+        pairs = []
+        for title, value in values.items():
+            label = self.stats_cards.get(title)
+            text = str(value)
+            if label is not None and self._stats_text[title] != text:
+                pairs += (label, text)
+                self._stats_text[title] = text
+        
+        if pairs:
+            self.tk.call('apply', _TCL_SET_LABEL_TEXTS, pairs)
+    
+    def load_todays_appointments(self, appointments):
+        """
+        Display today's appointments, touching only rows that changed
+        
+        Args:
+            appointments: (id, time, patient name, treatment, status) tuples
+                from get_appointment_list_rows
+        """
         try:
-            # Clear existing items
-            for item in self.appointments_tree.get_children():
-                self.appointments_tree.delete(item)
+            tree = self.appointments_tree
+            rows = {
+                apt_id: (time_str, patient_name, treatment, status.title())
+                for apt_id, time_str, patient_name, treatment, status in appointments
+            }
+            
+            if not self._displayed_appts:
+                # First fill: hide the columns and insert every row in one Tcl call
+                tree.configure(displaycolumns=())
+                try:
+                    tree.tk.call('apply', _TCL_INSERT_ROWS, tree,
+                                 [(apt_id,) + values for apt_id, values in rows.items()])
+                finally:
+                    tree.configure(displaycolumns='#all')
+                self._displayed_appts = rows
+                return
             
-            # Get today's appointments
-            today = date.today().isoformat()
-            appointments = self.db_manager.get_appointments(date=today)
+            # Each row's iid is its appointment id, so rows can be matched across reloads
+            removed = [str(apt_id) for apt_id in self._displayed_appts if apt_id not in rows]
+            if removed:
+                tree.delete(*removed)
             
-            # Add appointments to treeview
-            for apt in appointments:
-                time_str = apt['appointment_time'] if apt['appointment_time'] else "N/A"
-                patient_name = apt.get('patient_name', f"Patient {apt['patient_id']}")
-                treatment = apt.get('appointment_type', 'General Checkup')
-                status = apt.get('status', 'scheduled').title()
-                
-                self.appointments_tree.insert('', tk.END, values=(
-                    time_str,
-                    patient_name,
-                    treatment,
-                    status
-                ))
+            for index, (apt_id, values) in enumerate(rows.items()):
+                shown = self._displayed_appts.get(apt_id)
+                if shown is None:
+                    tree.insert('', index, iid=str(apt_id), values=values)
+                elif shown != values:
+                    tree.item(str(apt_id), values=values)
+            
+            # Restore time order in one call if a time change or insert shuffled the rows
+            order = tuple(str(apt_id) for apt_id in rows)
+            if tree.get_children() != order:
+                tree.set_children('', *order)
+            
+            self._displayed_appts = rows
             
         except Exception as e:
             self.logger.error(f"Error loading today's appointments: {e}")
@@ -351,7 +464,7 @@ class DashboardFrame(tk.Frame):
         """Quick action: Show invoice generation dialog"""
         try:
             # Get patients for invoice generation
-            patients = self.db_manager.get_patients()
+            patients = self.db_manager.list_patients_summary()
             if not patients:
                 messagebox.showinfo("No Patients", "No patients found. Please add patients first.")
                 return
@@ -415,8 +528,22 @@ class DashboardFrame(tk.Frame):
     
     def show_invoice_dialog(self, patients):
         """Show a simple invoice generation dialog"""
-        # Create a new window for invoice generation
+        self._invoice_patients = patients
+        if self._invoice_win is not None and self._invoice_win.winfo_exists():
+            # Reuse the hidden dialog with fresh patients and empty fields
+            patient_combo, patient_var, amount_var, notes_text = self._invoice_fields
+            patient_combo['values'] = [f"{p['first_name']} {p['last_name']}" for p in patients]
+            patient_var.set('')
+            amount_var.set('')
+            notes_text.delete(1.0, tk.END)
+            self._invoice_win.deiconify()
+            self._invoice_win.lift()
+            return
+        
+        # Create a new window for invoice generation; closing it only hides it
         invoice_window = tk.Toplevel(self)
+        invoice_window.protocol('WM_DELETE_WINDOW', invoice_window.withdraw)
+        self._invoice_win = invoice_window
         invoice_window.title("Generate Invoice")
         invoice_window.geometry("400x300")
         invoice_window.configure(bg='white')
@@ -425,7 +552,7 @@ class DashboardFrame(tk.Frame):
         title_label = tk.Label(
             invoice_window,
             text="Generate Invoice",
-            font=('Arial', 16, 'bold'),
+            font=self._f_dialog,
             bg='white'
         )
         title_label.pack(pady=20)
@@ -452,6 +579,7 @@ class DashboardFrame(tk.Frame):
         tk.Label(invoice_window, text="Notes:", bg='white').pack(pady=5)
         notes_text = tk.Text(invoice_window, height=3, width=30)
         notes_text.pack(pady=5)
+        self._invoice_fields = (patient_combo, patient_var, amount_var, notes_text)
         
         # Generate button
         def generate_invoice():
@@ -464,16 +592,13 @@ class DashboardFrame(tk.Frame):
                     messagebox.showwarning("Missing Information", "Please select a patient and enter an amount.")
                     return
                 
-                # Find the selected patient
-                patient = None
-                for p in patients:
-                    if f"{p['first_name']} {p['last_name']}" == selected_patient:
-                        patient = p
-                        break
-                
-                if not patient:
+                # The combo's values follow the patients list, so its index picks the
+                # patient directly, even when two patients share a name
+                index = patient_combo.current()
+                if index < 0:
                     messagebox.showerror("Error", "Selected patient not found.")
                     return
+                patient = self._invoice_patients[index]
                 
                 # Create invoice data
                 invoice_data = {
@@ -488,7 +613,7 @@ class DashboardFrame(tk.Frame):
                 invoice_id = self.db_manager.add_invoice(invoice_data)
                 
                 messagebox.showinfo("Success", f"Invoice generated successfully!\nInvoice ID: {invoice_id}\nPatient: {selected_patient}\nAmount: ${amount}")
-                invoice_window.destroy()
+                invoice_window.withdraw()
                 
             except ValueError:
                 messagebox.showerror("Invalid Amount", "Please enter a valid amount.")
@@ -510,8 +635,18 @@ class DashboardFrame(tk.Frame):
     
     def show_quick_patient_dialog(self):
         """Show a simplified patient addition dialog"""
-        # Create a new window for quick patient addition
+        if self._quick_patient_win is not None and self._quick_patient_win.winfo_exists():
+            # Reuse the hidden dialog with its fields cleared
+            for var in self._quick_patient_vars:
+                var.set('')
+            self._quick_patient_win.deiconify()
+            self._quick_patient_win.lift()
+            return
+        
+        # Create a new window for quick patient addition; closing it only hides it
         patient_window = tk.Toplevel(self)
+        patient_window.protocol('WM_DELETE_WINDOW', patient_window.withdraw)
+        self._quick_patient_win = patient_window
         patient_window.title("Quick Add Patient")
         patient_window.geometry("400x350")
         patient_window.configure(bg='white')
@@ -520,7 +655,7 @@ class DashboardFrame(tk.Frame):
         title_label = tk.Label(
             patient_window,
             text="Quick Add Patient",
-            font=('Arial', 16, 'bold'),
+            font=self._f_dialog,
             bg='white'
         )
         title_label.pack(pady=20)
@@ -558,6 +693,7 @@ class DashboardFrame(tk.Frame):
         treatment_var = tk.StringVar()
         treatment_entry = tk.Entry(form_frame, textvariable=treatment_var, width=30)
         treatment_entry.grid(row=4, column=1, sticky=tk.W, pady=5, padx=(10, 0))
+        self._quick_patient_vars = (first_name_var, last_name_var, age_var, phone_var, treatment_var)
         
         # Add button
         def add_patient():
@@ -595,12 +731,16 @@ class DashboardFrame(tk.Frame):
                 
                 # Add patient to database
                 patient_id = self.db_manager.add_patient(patient_data)
+                AppointmentFrame.invalidate_patient_cache()
+                self.invalidate_cache()
                 
                 messagebox.showinfo("Success", f"Patient added successfully!\nPatient ID: {patient_id}\nName: {patient_data['first_name']} {patient_data['last_name']}")
-                patient_window.destroy()
+                patient_window.withdraw()
                 
-                # Refresh dashboard data
-                self.load_dashboard_data()
+                # A new patient only changes the patient count, so bump it instead of reloading
+                total_patients = self._stats_text.get("Total Patients")
+                if total_patients is not None:
+                    self._update_stats({"Total Patients": int(total_patients) + 1})
                 
             except ValueError:
                 messagebox.showerror("Invalid Age", "Please enter a valid age.")
@@ -234,7 +234,7 @@ Receptionist: receptionist / recep123"""
         try:
             # Use the new user manager for authentication
             from database.user_manager import UserManager
-            user_manager = UserManager("clinic.db")
+            user_manager = UserManager(self.db_manager)
             user = user_manager.authenticate_user(username, password)
             
             if not user:
@@ -5,6 +5,7 @@ Main Window for Dental Clinic Management System
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 from .patient_frame import PatientFrame
@@ -22,6 +23,9 @@ class MainWindow:
         self.current_user = current_user
         self.logger = logging.getLogger(__name__)
         
+        # Worker threads shared by every frame for database calls that would block the UI
+        self.db_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dbio')
+        
         # Current frame reference
         self.current_frame: Optional[tk.Frame] = None
         
@@ -100,7 +104,7 @@ class MainWindow:
         # Navigation buttons based on user role
         nav_buttons = self.get_navigation_buttons()
         
-        for i, (text, command) in enumerate(nav_buttons):
+        for text, command in nav_buttons:
             btn = tk.Button(
                 nav_frame,
                 text=text,
@@ -193,7 +197,7 @@ class MainWindow:
     def show_appointments(self):
         """Show the appointments frame"""
         self.clear_content()
-        self.current_frame = AppointmentFrame(self.content_frame, self.db_manager)
+        self.current_frame = AppointmentFrame(self.content_frame, self.db_manager, self.db_executor)
         self.current_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.status_label.configure(text="Appointment management loaded")
         self.logger.info("Appointment management displayed")
@@ -296,6 +300,7 @@ class MainWindow:
         result = messagebox.askyesno("Logout", "Are you sure you want to logout?")
         if result:
             self.logger.info(f"User {self.current_user['username']} logged out")
+            self.db_executor.shutdown(wait=False)
             self.root.destroy()
             
             # Restart login window
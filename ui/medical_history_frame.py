@@ -133,8 +133,7 @@ class MedicalHistoryFrame(tk.Frame):
         """Load medical history from database"""
         try:
             # Clear existing items
-            for item in self.history_tree.get_children():
-                self.history_tree.delete(item)
+            self.history_tree.delete(*self.history_tree.get_children())
             
             if not self.patient_id:
                 return
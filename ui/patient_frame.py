@@ -8,6 +8,8 @@ from datetime import date
 import logging
 
 from models.patient import Patient
+from .appointment_frame import AppointmentFrame
+from .dashboard_frame import DashboardFrame
 
 class PatientFrame(tk.Frame):
     """Patient management frame"""
@@ -419,8 +421,7 @@ class PatientFrame(tk.Frame):
         """Load patients from database"""
         try:
             # Clear existing items
-            for item in self.patient_tree.get_children():
-                self.patient_tree.delete(item)
+            self.patient_tree.delete(*self.patient_tree.get_children())
             
             # Get search term
             search_term = self.search_var.get().strip()
@@ -434,7 +435,7 @@ class PatientFrame(tk.Frame):
                 )
             else:
                 # For other roles, show all patients
-                patients = self.db_manager.get_patients(search_term=search_term if search_term else None)
+                patients = self.db_manager.list_patients_summary(search_term=search_term if search_term else None)
             
             # Add patients to treeview
             for patient in patients:
@@ -575,6 +576,8 @@ class PatientFrame(tk.Frame):
             
             # Add patient to database
             patient_id = self.db_manager.add_patient(patient_data)
+            AppointmentFrame.invalidate_patient_cache()
+            DashboardFrame.invalidate_cache()
             
             messagebox.showinfo("Success", f"Patient added successfully with ID: {patient_id}")
             
@@ -605,6 +608,8 @@ class PatientFrame(tk.Frame):
             success = self.db_manager.update_patient(self.selected_patient['id'], patient_data)
             
             if success:
+                AppointmentFrame.invalidate_patient_cache()
+                DashboardFrame.invalidate_cache()
                 messagebox.showinfo("Success", "Patient updated successfully")
                 self.load_patients()
             else:
@@ -632,6 +637,8 @@ class PatientFrame(tk.Frame):
                 success = self.db_manager.delete_patient(self.selected_patient['id'])
                 
                 if success:
+                    AppointmentFrame.invalidate_patient_cache()
+                    DashboardFrame.invalidate_cache()
                     messagebox.showinfo("Success", "Patient deleted successfully")
                     self.clear_form()
                     self.load_patients()
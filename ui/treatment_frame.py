@@ -218,8 +218,7 @@ class TreatmentFrame(tk.Frame):
         """Load treatments from database"""
         try:
             # Clear existing items
-            for item in self.treatment_tree.get_children():
-                self.treatment_tree.delete(item)
+            self.treatment_tree.delete(*self.treatment_tree.get_children())
             
             # Get treatments from database
             treatments = self.db_manager.get_treatments()
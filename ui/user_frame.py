@@ -244,8 +244,7 @@ class UserFrame(tk.Frame):
         """Load users from database"""
         try:
             # Clear existing items
-            for item in self.user_tree.get_children():
-                self.user_tree.delete(item)
+            self.user_tree.delete(*self.user_tree.get_children())
             
             # Get users from database
             users = self.db_manager.get_users()